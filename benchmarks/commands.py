@@ -0,0 +1,64 @@
+"""
+Compares the latency of Command.execute before and after command modules were cached.
+list_logs is what the log file autocomplete of the discord extension runs on every keystroke.
+Run from the repository root: python -m benchmarks.commands
+"""
+import asyncio
+import importlib.util
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+
+import removalScheduler.core  # noqa: F401 - global_variables expects it to be imported
+from main.utils import Command, iterate_in_thread
+
+CALLS = 500
+LOG_LINES = 10000
+
+
+async def uncached_execute(command: Command, **kwargs):
+    """
+    Command.execute without the cache: the file is read, compiled and run on every call.
+    """
+    module = importlib.util.module_from_spec(command.spec)
+    command.spec.loader.exec_module(module)
+    if hasattr(module, "call"):
+        return_value = await asyncio.to_thread(module.call, **kwargs)
+        if isinstance(return_value, Iterator):
+            return iterate_in_thread(return_value)
+        return return_value
+    return await module.call_async(**kwargs)
+
+
+async def measure(execute, command: Command, **kwargs) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        result = await execute(command, **kwargs)
+        [item async for item in Command.iterate(result)]  # results can be lazy iterators or async generators
+    return (time.perf_counter() - start) / CALLS
+
+
+async def cached_execute(command: Command, **kwargs):
+    return await command.execute(**kwargs)
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as folder:
+        log_file = os.path.join(folder, "current.log")
+        with open(log_file, "w") as file:
+            for i in range(LOG_LINES):
+                file.write(f"2026-01-01 00:00:00,000 - INFO - benchmark line {i} (benchmarks/commands.py:1)\n")
+        cases = [
+            (Command("list_logs.py"), {}),
+            (Command("read_logs.py"), {"log_file": log_file, "mode": "tail", "lines": 100}),
+        ]
+        print(f"{'command':<12}{'uncached (us)':>16}{'cached (us)':>14}")
+        for command, kwargs in cases:
+            uncached = await measure(uncached_execute, command, **kwargs)
+            cached = await measure(cached_execute, command, **kwargs)
+            print(f"{command.cmd:<12}{uncached * 1e6:>16.1f}{cached * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
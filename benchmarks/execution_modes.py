@@ -0,0 +1,98 @@
+"""
+Compares the thread-per-core and the shared loop execution modes.
+It measures request latency, throughput and the amount of context switches of the whole process.
+Run from the repository root: python -m benchmarks.execution_modes
+"""
+import asyncio
+import os
+import resource
+import statistics
+import tempfile
+import threading
+import time
+
+import removalScheduler.core  # noqa: F401 - global_variables expects it to be imported
+from main import global_variables, utils
+
+CORES = 4
+SEQUENTIAL = 500
+CONCURRENT = 2000
+IDLE_SECONDS = 3
+
+
+def context_switches() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw + usage.ru_nivcsw
+
+
+def create_cores(mode: str) -> list[utils.Core]:
+    cores = []
+    for i in range(CORES):
+        core_class = type(f"Bench{i}", (utils.Core,), {"core_name": f"bench_{mode}_{i}"})
+        cores.append(core_class(threading.Event()))
+    return cores
+
+
+@utils.Core.not_toolable
+async def bench_echo(value: int):
+    return value
+
+
+async def run_mode(mode: str) -> dict[str, float]:
+    global_variables.shared_loop = mode == "shared"
+    cores = create_cores(mode)
+    for core in cores:
+        core.start()
+    await asyncio.sleep(0.5)
+
+    latencies = []
+    for i in range(SEQUENTIAL):
+        start = time.perf_counter()
+        request = utils.Request("bench", cores[i % CORES].core_name, "bench_echo", {"value": i})
+        await request.wait_for_response()
+        latencies.append(time.perf_counter() - start)
+
+    switches = context_switches()
+    start = time.perf_counter()
+    requests = [utils.Request("bench", cores[i % CORES].core_name, "bench_echo", {"value": i})
+                for i in range(CONCURRENT)]
+    await asyncio.gather(*(request.wait_for_response() for request in requests))
+    throughput = CONCURRENT / (time.perf_counter() - start)
+    burst_switches = context_switches() - switches
+
+    switches = context_switches()
+    await asyncio.sleep(IDLE_SECONDS)
+    idle_switches = (context_switches() - switches) / IDLE_SECONDS
+    threads = threading.active_count()
+
+    for core in cores:
+        core.kill()
+    while any(core.is_alive() for core in cores):
+        await asyncio.sleep(0.1)
+    latencies.sort()
+    return {
+        "threads": threads,
+        "p50 latency (ms)": statistics.median(latencies) * 1000,
+        "p99 latency (ms)": latencies[int(len(latencies) * 0.99)] * 1000,
+        "throughput (req/s)": throughput,
+        "switches per burst": burst_switches,
+        "idle switches per second": idle_switches,
+    }
+
+
+async def main():
+    results = {mode: await run_mode(mode) for mode in ("thread", "shared")}
+    print(f"{'':<26}{'thread':>12}{'shared':>12}")
+    for key in results["thread"].keys():
+        print(f"{key:<26}{results['thread'][key]:>12.2f}{results['shared'][key]:>12.2f}")
+
+
+if __name__ == "__main__":
+    root = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        os.mkdir(".logs")
+        try:
+            asyncio.run(main())
+        finally:
+            os.chdir(root)
@@ -0,0 +1,51 @@
+"""
+Compares the cost of a single get_string call before and after the locale was cached.
+It uses the discord extension's locale, the same strings /utils commands send.
+Run from the repository root: python -m benchmarks.locale_strings
+"""
+import logging
+import os
+import timeit
+
+import yaml
+
+from main.utils import Locale
+
+LOCALE = os.path.join("extensions", "dsc", "locale_us.yaml")
+CALLS = 2000
+CASES = [
+    ("utils_list_logs_first_response", {}),
+    ("utils_read_logs_first_response", {"log_file": ".logs/current.log"}),
+    ("channels_create_first_response", {"channel_name": "general", "channel_type": "text", "category_name": "chat"}),
+]
+
+
+def uncached_get_string(target: str, **replaces):
+    """
+    get_string as it was before the cache: parse the whole file, then replace every placeholder.
+    """
+    if not os.path.exists(LOCALE):
+        return target
+    with open(LOCALE, "r") as file:
+        locale = yaml.safe_load(file)
+    try:
+        to_return = locale[target]
+    except KeyError:
+        return target
+    for to_replace in replaces.keys():
+        to_return = to_return.replace(f"%{to_replace}%", str(replaces[to_replace]))
+    return to_return.replace("\n ", "\n")
+
+
+def main():
+    locale = Locale(LOCALE, logging.getLogger(__name__))
+    print(f"{'string':<34}{'uncached (us)':>16}{'cached (us)':>14}")
+    for target, replaces in CASES:
+        assert uncached_get_string(target, **replaces) == locale.get_string(target, **replaces)
+        uncached = timeit.timeit(lambda: uncached_get_string(target, **replaces), number=CALLS // 20) / (CALLS // 20)
+        cached = timeit.timeit(lambda: locale.get_string(target, **replaces), number=CALLS) / CALLS
+        print(f"{target:<34}{uncached * 1e6:>16.1f}{cached * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
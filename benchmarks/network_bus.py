@@ -0,0 +1,88 @@
+"""
+Measures requests sent to a core on another host over the networked request bus.
+Both hosts run on this machine: a second process serves the core over localhost.
+Run from the repository root: python -m benchmarks.network_bus
+"""
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import removalScheduler.core  # noqa: F401 - global_variables expects it to be imported
+from main import global_variables, utils
+from main.network import BusServer, RemoteCore
+
+ADDRESS = "127.0.0.1:8765"
+SEQUENTIAL = 500
+CONCURRENT = 5000
+
+
+class Remote(utils.Core):
+    core_name = "bench_remote"
+
+
+@Remote.not_toolable
+async def bench_echo(value: int):
+    return value
+
+
+async def serve():
+    core = Remote(global_variables.terminate_signal)
+    global_variables.threads.append(core)
+    server = BusServer(global_variables.terminate_signal, ADDRESS)
+    core.start()
+    server.start()
+    sys.stdin.readline()  # parent closes stdin when it's done
+    global_variables.terminate_signal.set()
+
+
+async def measure():
+    core = RemoteCore.for_address("bench_remote", ADDRESS, threading.Event())
+    global_variables.threads.append(core)
+    core.start()
+    while not core.is_set():
+        await asyncio.sleep(0.05)
+
+    latencies = []
+    for i in range(SEQUENTIAL):
+        start = time.perf_counter()
+        await utils.Request("bench", core.core_name, "bench_echo", {"value": i}).wait_for_response()
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    requests = [utils.Request("bench", core.core_name, "bench_echo", {"value": i}) for i in range(CONCURRENT)]
+    responses = await asyncio.gather(*(request.wait_for_response() for request in requests))
+    throughput = CONCURRENT / (time.perf_counter() - start)
+    assert responses == list(range(CONCURRENT))
+    core.kill()
+
+    latencies.sort()
+    print(f"p50 latency: {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"p99 latency: {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(f"pipelined throughput: {throughput:.0f} req/s over {core.pool_size} connections")
+
+
+def main():
+    os.environ.setdefault("BUS_SECRET", "benchmark")
+    root = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.mkdir(os.path.join(folder, ".logs"))
+        server = subprocess.Popen([sys.executable, "-m", "benchmarks.network_bus", "--serve"], cwd=folder,
+                                  stdin=subprocess.PIPE, env={**os.environ, "PYTHONPATH": root})
+        os.chdir(folder)
+        try:
+            asyncio.run(measure())
+        finally:
+            os.chdir(root)
+            server.stdin.close()
+            server.wait(10)
+
+
+if __name__ == "__main__":
+    if "--serve" in sys.argv:
+        asyncio.run(serve())
+    else:
+        main()
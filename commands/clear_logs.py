@@ -1,12 +1,14 @@
 import os
 
+from main.logs import INDEX_SUFFIX
+
 
 async def call_async():
     from main import global_variables
     from removalScheduler.core import DeletionReason
     for curdir, subfolders, files in os.walk(".logs"):
         for file in files:
-            if "current" in file:
-                continue
+            if "current" in file or file.endswith(INDEX_SUFFIX):
+                continue  # indexes are deleted together with their logs
             global_variables.scheduler.delete_file(os.path.join(curdir, file), DeletionReason.MANUAL)
     await global_variables.scheduler.clear_scheduler()
\ No newline at end of file
@@ -1,9 +1,33 @@
 import os
+from collections.abc import Iterator
 
+from main.logs import INDEX_SUFFIX, LogIndex, parse_time
 
-def call():
-    return_list = []
+
+def call(since: str | None = None, until: str | None = None):
+    """
+    Lists every log.
+    :param since: Only logs with records from this time on, ISO format. Uses the logs' indexes.
+    :param until: Only logs with records up to this time, ISO format.
+    :return: Iterator of logs as they're found, or a list starting with "failed" on invalid input.
+    """
+    try:
+        start, end = parse_time(since), parse_time(until)
+    except ValueError as e:
+        return ["failed", str(e)]
+    return walk_logs(start, end)
+
+
+def walk_logs(start: float | None, end: float | None) -> Iterator[str]:
     for curdir, subfolders, files in os.walk(".logs"):
         for file in files:
-            return_list.append(f"{os.path.join(curdir, file)}")
-    return return_list
\ No newline at end of file
+            if file.endswith(INDEX_SUFFIX):
+                continue
+            if start is not None or end is not None:
+                span = LogIndex(os.path.join(curdir, file)).span()
+                # the newest records of the log being written aren't indexed yet, it can always have newer ones
+                active = file == "current.log"
+                if span is not None and ((start is not None and span[1] < start and not active) or
+                                         (end is not None and span[0] > end)):
+                    continue
+            yield os.path.join(curdir, file)
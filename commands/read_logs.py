@@ -1,8 +1,32 @@
 import os.path
+from typing import Literal
 
+from main.logs import LogReader
 
-def call(log_file: str):
+
+def call(log_file: str, mode: Literal["all", "tail", "offset", "range", "time"] = "all", start: int = 0,
+         end: int | None = None, lines: int = 100, since: str | None = None, until: str | None = None):
+    """
+    Reads the log line by line.
+    :param log_file: Log to read.
+    :param mode: "all" reads everything, "tail" the last "lines" lines, "offset" "lines" lines from "start",
+    "range" lines from "start" up to "end" and "time" records between "since" and "until".
+    :return: Iterator of lines, or a list starting with "failed" if the log doesn't exist.
+    """
     if not os.path.exists(log_file):
         return ["failed", "Failed to read the file. Check if log exist."]
-    with open(log_file, "r", encoding="utf-8") as file:
-        return file.readlines()
\ No newline at end of file
+    reader = LogReader(log_file)
+    match mode:
+        case "tail":
+            return reader.tail(lines)
+        case "offset":
+            return reader.offset(start, lines)
+        case "range":
+            return reader.lines(start, end)
+        case "time":
+            try:
+                return reader.window(since, until)
+            except ValueError as e:
+                return ["failed", str(e)]
+        case _:
+            return reader.lines()
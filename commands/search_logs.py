@@ -0,0 +1,26 @@
+import itertools
+import re
+
+from main.logs import search
+
+
+def call(pattern: str, level: str | None = None, since: str | None = None, until: str | None = None,
+         limit: int = 50):
+    """
+    Searches logs of every core.
+    :param pattern: Regular expression searched in every line.
+    :param level: Lowest level of the records, for example "WARNING".
+    :param since: Only records from this time, ISO format: "2025-01-31 12:00".
+    :param until: Only records up to this time, ISO format.
+    :param limit: Maximum amount of results.
+    :return: Iterator of matching lines prefixed with their log, or a list starting with "failed" on invalid input.
+    """
+    results = search(pattern, level=level, since=since, until=until, limit=limit)
+    try:
+        # input is checked when the search starts
+        first = next(results, None)
+    except (re.error, ValueError, TypeError) as e:
+        return ["failed", str(e)]
+    if first is None:
+        return iter(())
+    return (str(result) for result in itertools.chain((first,), results))
@@ -0,0 +1,6 @@
+def call():
+    """
+    Shows how long the start of the program took, per phase, per extension and per imported module.
+    """
+    from main.global_variables import startup_profiler
+    return startup_profiler.lines()
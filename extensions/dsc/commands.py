@@ -30,23 +30,44 @@ class Utilities(commands.Group):
             self.bot.core.kill()
 
     @app_commands.command(name="list_logs", description="Lists every log file. Use /utils read_logs to read them.")
-    async def list_logs(self, interaction: discord.Interaction):
+    @app_commands.describe(since="Only logs with records from this time. Format: YYYY-MM-DD HH:MM")
+    @app_commands.describe(until="Only logs with records up to this time. Format: YYYY-MM-DD HH:MM")
+    async def list_logs(self, interaction: discord.Interaction, since: str | None = None, until: str | None = None):
         self.logger.log(logging.INFO, f"{interaction.user.name} has executed \"{self.name} list_logs\",")
         from main.global_variables import cmds
         await interaction.response.send_message(await self.get_string("utils_list_logs_first_response"))
-        logs = await cmds["list_logs"].execute()
+        logs = await cmds["list_logs"].execute(since=since, until=until)
+        if isinstance(logs, list) and len(logs) > 0 and logs[0] == "failed":
+            await interaction.edit_original_response(
+                content=await self.get_string(
+                    "utils_list_logs_failed_response",
+                    error=logs[1]
+                )
+            )
+            return
         await interaction.edit_original_response(
             content=await self.get_string(
                 "utils_list_logs_end_response",
-                log_files="\n    " + "\n    ".join(
-                    log for log in logs)
+                log_files=""
             )
         )
+        from main.logs import pack_messages_async
+        async for message in pack_messages_async(f"    {log}\n" async for log in main.utils.Command.iterate(logs)):
+            await interaction.channel.send(content=message)
 
     @app_commands.command(name="read_logs", description="Read the log file provided.")
     @app_commands.describe(log_file="Log file")
+    @app_commands.describe(mode="What part of the log to read. Default: all")
+    @app_commands.describe(start="First line to read in offset and range modes. Lines are counted from 0.")
+    @app_commands.describe(end="Line to stop at in range mode.")
+    @app_commands.describe(lines="Amount of lines to read in tail and offset modes. Default: 100")
+    @app_commands.describe(since="Time of the first log in time mode. Format: YYYY-MM-DD HH:MM")
+    @app_commands.describe(until="Time of the last log in time mode. Format: YYYY-MM-DD HH:MM")
     @app_commands.autocomplete(log_file=log_file_autocomplete)
-    async def read_logs(self, interaction: discord.Interaction, log_file: str):
+    async def read_logs(self, interaction: discord.Interaction, log_file: str,
+                        mode: Literal["all", "tail", "offset", "range", "time"] = "all", start: int = 0,
+                        end: int | None = None, lines: int = 100, since: str | None = None,
+                        until: str | None = None):
         self.logger.log(logging.INFO, f"{interaction.user.name} has executed \"{self.name} read_logs\",")
         from main.global_variables import cmds
         await interaction.response.send_message(
@@ -55,44 +76,98 @@ class Utilities(commands.Group):
                 log_file=log_file
             )
         )
-        logs: list[str] = await cmds["read_logs"].execute(log_file=log_file)
-        if logs[0] == "failed":
+        logs = await cmds["read_logs"].execute(log_file=log_file, mode=mode, start=start, end=end, lines=lines,
+                                               since=since, until=until)
+        if isinstance(logs, list) and len(logs) > 0 and logs[0] == "failed":
             await interaction.edit_original_response(
                 content=await self.get_string(
                     "utils_read_logs_failed_response"
                 )
             )
-        else:
-            await interaction.edit_original_response(
+            return
+        await interaction.edit_original_response(
+            content=await self.get_string(
+                "utils_read_logs_end_response",
+                log_file=log_file
+            )
+        )
+        from extensions.dsc import utils
+        from main.logs import pack_messages_async
+        utils.READING_LOG = ReadingLogState.READING
+        messages = pack_messages_async(main.utils.Command.iterate(logs))
+        try:
+            async for message in messages:
+                if utils.READING_LOG != ReadingLogState.READING:
+                    break
+                await interaction.channel.send(content=message)
+        finally:
+            await messages.aclose()
+        if utils.READING_LOG == ReadingLogState.STOP:
+            await interaction.channel.send(
                 content=await self.get_string(
-                    "utils_read_logs_end_response",
-                    log_file=log_file
+                    "utils_read_logs_force_stop_response"
                 )
             )
-            from extensions.dsc import utils
-            utils.READING_LOG = ReadingLogState.READING
-            log = ""
-            i = 0
-            while i < len(logs) and utils.READING_LOG == ReadingLogState.READING:
-                if len(log + logs[i]) < 2000:
-                    log += logs[i]
-                    i += 1
-                else:
-                    if len(log) == 0:
-                        i += 1
-                        continue
-                    await interaction.channel.send(content=log)
-                    log = ""
-            if len(log) > 0:
-                await interaction.channel.send(content=log)
-            if utils.READING_LOG == ReadingLogState.STOP:
-                await interaction.channel.send(
-                    content=await self.get_string(
-                        "utils_read_logs_force_stop_response"
-                    )
+        if utils.READING_LOG in [ReadingLogState.READING, ReadingLogState.STOP]:
+            utils.READING_LOG = ReadingLogState.IDLE
+
+    @app_commands.command(name="search_logs", description="Searches logs of every extension.")
+    @app_commands.describe(pattern="Regular expression to search for.")
+    @app_commands.describe(level="Lowest level of the logs. Default: all levels")
+    @app_commands.describe(since="Only logs from this time. Format: YYYY-MM-DD HH:MM")
+    @app_commands.describe(until="Only logs up to this time. Format: YYYY-MM-DD HH:MM")
+    @app_commands.describe(limit="Maximum amount of results. Default: 50")
+    async def search_logs(self, interaction: discord.Interaction, pattern: str,
+                          level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] | None = None,
+                          since: str | None = None, until: str | None = None, limit: int = 50):
+        self.logger.log(logging.INFO, f"{interaction.user.name} has executed \"{self.name} search_logs\",")
+        from main.global_variables import cmds
+        await interaction.response.send_message(
+            await self.get_string(
+                "utils_search_logs_first_response",
+                pattern=pattern
+            )
+        )
+        results = await cmds["search_logs"].execute(pattern=pattern, level=level, since=since, until=until,
+                                                    limit=limit)
+        if isinstance(results, list) and len(results) > 0 and results[0] == "failed":
+            await interaction.edit_original_response(
+                content=await self.get_string(
+                    "utils_search_logs_failed_response",
+                    error=results[1]
                 )
-            if utils.READING_LOG in [ReadingLogState.READING, READING_LOG.STOP]:
-                utils.READING_LOG = ReadingLogState.IDLE
+            )
+            return
+        from main.logs import MessagePacker
+        packer = MessagePacker()
+        found = 0
+        async for result in main.utils.Command.iterate(results):
+            found += 1
+            for message in packer.add(result + "\n"):
+                await interaction.channel.send(content=message)
+        for message in packer.finish():
+            await interaction.channel.send(content=message)
+        await interaction.edit_original_response(
+            content=await self.get_string(
+                "utils_search_logs_end_response",
+                pattern=pattern,
+                results=found
+            )
+        )
+
+    @app_commands.command(name="startup_report", description="Shows how long the start of the bot took.")
+    async def startup_report(self, interaction: discord.Interaction):
+        self.logger.log(logging.INFO, f"{interaction.user.name} has executed \"{self.name} startup_report\",")
+        from main.global_variables import cmds
+        await interaction.response.send_message(await self.get_string("utils_startup_report_first_response"))
+        await interaction.edit_original_response(
+            content=await self.get_string(
+                "utils_startup_report_end_response"
+            )
+        )
+        from main.logs import pack_messages_async
+        async for message in pack_messages_async(f"{line}\n" async for line in cmds["startup_report"].stream()):
+            await interaction.channel.send(content=message)
 
     @app_commands.command(name="clear_logs", description="Deletes all logs.")
     async def clear_logs(self, interaction: discord.Interaction):
@@ -229,6 +304,7 @@ class Utilities(commands.Group):
             )
             return
         from main import utils
+        from main.exceptions import RequestTimedOut, RequestCancelled
         request = utils.Request(source=self.bot.core.core_name, destination=core_name, function_name=function_name,
                                 arguments=args)
         await interaction.edit_original_response(
@@ -237,7 +313,16 @@ class Utilities(commands.Group):
                     request=request
             )
         )
-        await request.wait_for_response()
+        try:
+            await request.wait_for_response()
+        except (Exception, RequestTimedOut, RequestCancelled) as e:
+            await interaction.followup.send(
+                content=await self.get_string(
+                    "utils_request_request_failed",
+                    error=str(e)
+                )
+            )
+            return
         if request.get_response() is not None:
             await interaction.followup.send(
                 content=await self.get_string(
@@ -559,11 +644,7 @@ class Extensions(commands.Group):
                 "extensions_list_unloaded_first_response"
             )
         )
-        extensions = []
-        for extension in os.listdir(os.path.join("extensions")):
-            if await main.utils.get_extension(extension):
-                ext = await get_extension_from_folder(extension)
-                extensions.append(ext[0])
+        extensions = get_unloaded_extensions()
         await interaction.edit_original_response(
             content=await self.get_string(
                 "extensions_list_unloaded_success_response",
@@ -659,6 +740,8 @@ class Extensions(commands.Group):
                 "extensions_reload_success_response"
             )
         )
+        from main.global_variables import extension_catalog
+        extension_catalog.reload(ext[1])
         main.utils.add_thread_to_start(ext[1], 3)
         await exten.unload()
 
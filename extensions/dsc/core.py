@@ -2,6 +2,7 @@ import asyncio
 import logging
 import os
 import threading
+import time
 
 import discord
 from discord.ext import commands
@@ -25,10 +26,14 @@ class Core(utils.Core):
 
         async def on_ready(self):
             self.logger.log(logging.INFO, f"Logged on as {self.user}")
+            from main.global_variables import startup_profiler
+            if not self.core.is_set():
+                startup_profiler.record("login", self.core.login_started, time.perf_counter(), self.core.core_name)
 
             guild_id = os.getenv("GUILD_ID")
             self.tree.copy_global_to(guild=discord.Object(id=guild_id))
-            await self.tree.sync(guild=discord.Object(id=guild_id))
+            with startup_profiler.phase("tree.sync", self.core.core_name):
+                await self.tree.sync(guild=discord.Object(id=guild_id))
 
             self.core.set()
 
@@ -52,6 +57,7 @@ class Core(utils.Core):
     def __init__(self, terminate_signal: threading.Event, **kwargs):
         super().__init__(terminate_signal, logger_name="discord",  **kwargs)
         self.bot: Core.CustomBot = None
+        self.login_started = time.perf_counter()
 
     async def call(self):
         self.bot: Core.CustomBot = Core.CustomBot(self)
@@ -59,6 +65,7 @@ class Core(utils.Core):
         load_dotenv()
         bot_token = os.getenv("BOT_TOKEN")
         await super().call()
+        self.login_started = time.perf_counter()
         await self.bot.start(token=bot_token)
 
     async def stay_alive(self):
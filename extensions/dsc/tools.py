@@ -1,10 +1,13 @@
 import logging
 import os
+from collections.abc import AsyncIterator
 
 import discord.app_commands
-from extensions.dsc.utils import Group
+from extensions.dsc.utils import Group, StreamedResponse
 
 from extensions.dsc.core import Core
+from main.exceptions import QueueFull
+from main.utils import Request
 
 
 @Core.requestable
@@ -17,6 +20,49 @@ def dummy_function():
 
 @Core.not_toolable
 async def create_command(core: Core, category_name: str, command: discord.app_commands.Command):
+    await add_command(core, category_name, command)
+
+
+@Core.not_toolable
+async def create_chat_command(core: Core, category_name: str, name: str, description: str, destination: str,
+                              function_name: str):
+    """
+    Adds a command that sends the text written by the user to a function of another core and shows its response.
+    Only names are sent, so it works for cores in another process or on another host too.
+    The function is called with "guild_id", "channel_id" and "text". It can return the response as a string,
+    or as an async iterator of its parts when it runs in this process, which are shown as they come.
+    """
+    async def callback(interaction: discord.Interaction, text: str):
+        await interaction.response.send_message(content=await core.get_string("chat_command_first_response"))
+        request = Request(source=core.core_name, destination=destination, function_name=function_name,
+                          arguments={"guild_id": interaction.guild_id, "channel_id": interaction.channel_id,
+                                     "text": text})
+        response = StreamedResponse(interaction)
+        try:
+            result = await request.wait_for_response()
+            if isinstance(result, AsyncIterator):
+                async for part in result:
+                    await response.add(part)
+            else:
+                await response.add(str(result))
+        except QueueFull:
+            await interaction.edit_original_response(content=await core.get_string("chat_command_busy_response"))
+            return
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except BaseException as e:
+            core.logger.log(logging.ERROR, f"Chat command {name} has failed.", exc_info=e)
+            await interaction.edit_original_response(
+                content=await core.get_string("chat_command_failed_response", error=str(e))
+            )
+            return
+        await response.finish()
+
+    await add_command(core, category_name, discord.app_commands.Command(name=name, description=description,
+                                                                        callback=callback))
+
+
+async def add_command(core: Core, category_name: str, command: discord.app_commands.Command):
     guild_id = os.getenv("GUILD_ID")
     core.logger.log(logging.DEBUG, f"Adding new command: {command.name} to category: {category_name}")
     for group in core.bot.tree.get_commands():
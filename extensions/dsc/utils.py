@@ -1,4 +1,5 @@
 import os
+import time
 from enum import Enum
 
 import discord
@@ -6,6 +7,7 @@ from discord import app_commands, ChannelType
 from dotenv import load_dotenv
 
 import main.utils
+from main.logs import DISCORD_LIMIT
 
 """
 --------------------------------
@@ -90,8 +92,8 @@ def categories_has_role(guild: discord.Guild, role: discord.Role) -> list[discor
 
 async def log_file_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
     from main.global_variables import cmds
-    logs: list[str] = await cmds["list_logs"].execute()
-    logs.sort(key=lambda log: log.rsplit("\\", maxsplit=1)[1], reverse=True)
+    logs = [log async for log in cmds["list_logs"].stream()]
+    logs.sort(key=os.path.basename, reverse=True)
     while len(logs) > 25:
         logs.pop(25)
     choices = [app_commands.Choice(name=log_file, value=log_file) for log_file in logs if
@@ -109,18 +111,19 @@ async def loaded_extension_autocomplete(interaction: discord.Interaction, curren
 
 async def unloaded_extension_autocomplete(interaction: discord.Interaction, current: str) -> list[
     app_commands.Choice[str]]:
-    extensions = []
-    for extension in os.listdir(os.path.join("extensions")):
-        ext = await main.utils.get_extension(extension)
-        if ext:
-            core: str = ext.core.Core.core_name
-            from main import global_variables
-            if core not in [exts.core_name for exts in global_variables.threads]:
-                extensions.append(core)
-    return [app_commands.Choice(name=extension, value=extension) for extension in extensions
+    return [app_commands.Choice(name=extension, value=extension) for extension in get_unloaded_extensions()
             if current.lower() in extension.lower()]
 
 
+def get_unloaded_extensions() -> list[str]:
+    """
+    Returns names of cores of every available extension that isn't loaded.
+    """
+    from main import global_variables
+    loaded = [core.core_name for core in global_variables.threads]
+    return [entry.core_name for entry in global_variables.extension_catalog.entries() if entry.core_name not in loaded]
+
+
 """
 -----------------
     UTILITIES
@@ -148,13 +151,16 @@ def get_self_role_from_guild(guild: discord.Guild):
 
 
 async def get_extension_from_folder(extension: str) -> tuple[str, str] | None:
-    for e in os.listdir(os.path.join("extensions")):
-        ext = await main.utils.get_extension(e)
-        if ext:
-            core: str = ext.core.Core.core_name
-            if core == extension:
-                return extension, e
-    return None
+    """
+    Finds the extension by the name of its core.
+    :param extension: Name of the extension's core.
+    :return: Name of the core and folder of the extension.
+    """
+    from main.global_variables import extension_catalog
+    entry = extension_catalog.by_core_name(extension)
+    if entry is None:
+        return None
+    return entry.core_name, entry.folder
 
 
 """
@@ -170,6 +176,65 @@ class Group(app_commands.Group):
         super().__init__(*args, **kwargs)
 
 
+class StreamedResponse:
+    """
+    Shows text that is produced bit by bit as the response to an interaction.
+    Edits are coalesced to at most one per "interval" seconds to stay within Discord's rate limits.
+    Text over Discord's message limit continues in follow-up messages.
+    """
+    def __init__(self, interaction: discord.Interaction, interval: float = 1.0, limit: int = DISCORD_LIMIT):
+        """
+        The interaction has to be responded to already, its response is edited.
+        :param interaction: Interaction to respond to.
+        :param interval: Seconds between edits of a message.
+        :param limit: Maximum length of a message.
+        """
+        self.interaction = interaction
+        self.interval = interval
+        self.limit = limit
+        self.__text = ""  # text of the message that is currently written
+        self.__shown = ""  # text that message shows on Discord
+        self.__message: discord.WebhookMessage | None = None
+        self.__original = True  # if the current message is the original response
+        self.__edited = 0.0
+
+    async def add(self, text: str):
+        """
+        Adds text to the response. It's shown with the next edit.
+        """
+        self.__text += text
+        while len(self.__text) > self.limit:
+            cut = self.__text.rfind("\n", self.limit // 2, self.limit)
+            cut = cut + 1 if cut != -1 else self.limit
+            await self.__show(self.__text[:cut])
+            self.__text = self.__text[cut:]
+            self.__shown = ""
+            self.__message, self.__original = None, False
+        if time.monotonic() - self.__edited >= self.interval:
+            await self.__show(self.__text)
+
+    async def finish(self, empty_text: str = "..."):
+        """
+        Shows the rest of the text.
+        :param empty_text: Text shown if nothing was added.
+        """
+        if self.__original and not self.__text.strip():
+            self.__text = empty_text
+        await self.__show(self.__text)
+
+    async def __show(self, text: str):
+        if text == self.__shown or not text.strip():
+            return
+        if self.__original:
+            await self.interaction.edit_original_response(content=text)
+        elif self.__message is None:
+            self.__message = await self.interaction.followup.send(content=text, wait=True)
+        else:
+            await self.__message.edit(content=text)
+        self.__shown = text
+        self.__edited = time.monotonic()
+
+
 """
 -------------
     ENUMS    
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Sequence
+
+import ollama
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def cache_key(model: str, options: dict[str, Any], messages: Sequence[ollama.Message]) -> str:
+    """
+    Hash of the model, its options and the messages, with case and whitespace of the messages ignored.
+    """
+    data = json.dumps([model, options, [(message.role, normalize(message.content or "")) for message in messages]],
+                      sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Responses of the model to recent prompts, kept in memory.
+    The least recently used responses are evicted first, when there are too many or they take too much memory,
+    and every response is evicted once it's older than "ttl".
+    """
+    def __init__(self, ttl: float = 3600, max_entries: int = 1000, max_bytes: int = 16 * 1024 * 1024):
+        """
+        :param ttl: Seconds a response is kept for.
+        :param max_entries: Maximum amount of responses.
+        :param max_bytes: Maximum size of every response together, in bytes of UTF-8.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[str, tuple[str, float, int]] = OrderedDict()  # key: response, created, size
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                self.__remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, response: str):
+        size = len(key) + len(response.encode())
+        if size > self.max_bytes:
+            return
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+            self.__entries[key] = (response, time.monotonic(), size)
+            self.__bytes += size
+            while len(self.__entries) > self.max_entries or self.__bytes > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+
+    def __remove(self, key: str):
+        _, _, size = self.__entries.pop(key)
+        self.__bytes -= size
+
+    def metrics(self) -> dict[str, int]:
+        with self.__lock:
+            return {"entries": len(self.__entries), "bytes": self.__bytes, "hits": self.hits, "misses": self.misses}
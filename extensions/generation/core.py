@@ -1,16 +1,39 @@
+import asyncio
+import concurrent.futures
 import logging
 import os
 import threading
+import time
+import weakref
+from collections.abc import AsyncIterator
 
 from dotenv import load_dotenv
 from ollama import AsyncClient
 
+from extensions.generation.cache import ResponseCache, cache_key
+from extensions.generation.scheduler import GenerationScheduler
 from extensions.generation.utils import *
 from main import utils
+from main.exceptions import RequestCancelled, RequestTimedOut
 
 
 class Core(utils.Core):
     core_name = "ollama"
+    keep_alive = "10m"  # how long ollama keeps the model loaded after the last use
+    keep_alive_refresh = 240  # seconds without chats after which the keep-alive is refreshed
+    context_tokens = 4096  # token budget of a conversation sent to the model
+    per_channel_context = False  # if True every channel has its own conversation, otherwise every guild
+    summarize_evicted = False  # if True messages that don't fit the budget anymore are summarized in the background
+    database = os.path.join(".data", "generation.sqlite")  # where conversations are kept between restarts
+    max_active_conversations = 100  # conversations kept in memory, others are loaded from the database when used
+    tool_timeout = 30  # seconds a single tool call can take
+    max_concurrent_chats = 2  # chats sent to the model at once, others wait in their conversation's queue
+    max_waiting_per_conversation = 3  # turns waiting in a conversation before new ones are turned away
+    max_waiting_chats = 50  # turns waiting in every conversation together before new ones are turned away
+    cache_responses = False  # if True responses to repeated prompts are answered from memory without the model
+    cache_ttl = 3600  # seconds a cached response is kept for
+    cache_max_entries = 1000
+    cache_max_bytes = 16 * 1024 * 1024
 
     def __init__(self, terminate_signal: threading.Event, **kwargs):
         load_dotenv()
@@ -20,32 +43,214 @@ class Core(utils.Core):
             "top_p": 0.9,
             "max_tokens": 300
         }
-        self.messages = Messages(self)
+        self.__summaries: dict[Conversation, asyncio.Task] = {}
         super().__init__(terminate_signal, **kwargs)
-        self.__preload_model()
-        self.__client = AsyncClient()
+        self.store = ConversationStore(self.database, self.logger)
+        self.store.start()
+        self.messages = Messages(self, self.store, budget=self.context_tokens,
+                                 system_prompt=os.getenv("T2T_SYSTEM_PROMPT"), per_channel=self.per_channel_context,
+                                 summarize=self.summarize_evicted, max_active=self.max_active_conversations)
+        self.__clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClient] = \
+            weakref.WeakKeyDictionary()  # chats come from loops of other cores, connections can't be shared
+        self.__warm: concurrent.futures.Future = concurrent.futures.Future()  # done once the model is loaded
+        self.__warm_up_task: asyncio.Task | None = None
+        self.__refresh_task: asyncio.Task | None = None
+        self.__last_used = time.monotonic()
+        self.scheduler = GenerationScheduler(self.max_concurrent_chats, self.max_waiting_per_conversation,
+                                             self.max_waiting_chats)
+        self.cache = ResponseCache(self.cache_ttl, self.cache_max_entries, self.cache_max_bytes) \
+            if self.cache_responses else None
 
     async def call(self):
         await init_discord_commands(self)
-        self.set()
+        self.__warm_up_task = asyncio.create_task(self.__warm_up())
+        self.set()  # requests are accepted now, chats wait for the model to be warm
         await super().call()
 
-    def __preload_model(self, **kwargs):
+    async def loop(self):
+        await super().loop()
+        if self.is_warm() and time.monotonic() - self.__last_used >= self.keep_alive_refresh and \
+                (self.__refresh_task is None or self.__refresh_task.done()):
+            self.__refresh_task = asyncio.create_task(self.__refresh_keep_alive())
+
+    def is_warm(self) -> bool:
+        """
+        Returns if the model was loaded by ollama. The core accepts requests before that.
+        """
+        return self.__warm.done()
+
+    async def wait_until_warm(self):
+        """
+        Waits for the model to be loaded. It can be awaited from the loop of any core.
+        """
+        await asyncio.wrap_future(self.__warm)
+
+    def __client(self) -> AsyncClient:
+        """
+        Returns the client for the running loop.
+        """
+        loop = asyncio.get_running_loop()
+        client = self.__clients.get(loop)
+        if client is None:
+            client = self.__clients[loop] = AsyncClient()
+        return client
+
+    async def __warm_up(self):
+        from main.global_variables import startup_profiler
         self.logger.log(logging.INFO, f"Preloading model: {self.__model_name}")
-        ollama.generate(model=self.__model_name, prompt="", options=self.__options, **kwargs)
-        self.logger.log(logging.INFO, f"Preloaded model: {self.__model_name}")
+        start = time.perf_counter()
+        try:
+            await self.__client().generate(model=self.__model_name, prompt="", options=self.__options,
+                                         keep_alive=self.keep_alive)
+            self.logger.log(logging.INFO, f"Preloaded model: {self.__model_name}")
+        except Exception as e:
+            self.logger.log(logging.ERROR, f"Couldn't preload model: {self.__model_name}", exc_info=e)
+        finally:
+            startup_profiler.record("warm-up", start, time.perf_counter(), self.core_name)
+            self.__last_used = time.monotonic()
+            self.__warm.set_result(None)  # chats are let through even if preloading failed
+
+    async def __refresh_keep_alive(self):
+        self.__last_used = time.monotonic()
+        try:
+            await self.__client().generate(model=self.__model_name, prompt="", keep_alive=self.keep_alive)
+            self.logger.log(logging.DEBUG, f"Refreshed keep-alive of model: {self.__model_name}")
+        except Exception as e:
+            self.logger.log(logging.WARNING, f"Couldn't refresh keep-alive of model: {self.__model_name}", exc_info=e)
+
+    async def stay_alive(self):
+        for task in (self.__warm_up_task, self.__refresh_task, *self.__summaries.values()):
+            if task is not None:
+                task.cancel()
+        await super().stay_alive()
+        await asyncio.to_thread(self.store.stop)
 
     async def chat_model(self, guild: discord.Guild, text: str,
                          role: Literal['user', 'assistant', 'system', 'tool'] = "user",
                          images: Optional[Sequence[Image]] = None) -> ollama.Message:
-        self.messages.add_message_args(guild=guild, text=text, role=role, images=images)
+        parts = [part async for part in self.stream_model(guild=guild, text=text, role=role, images=images)]
+        return ollama.Message(role="assistant", content="".join(parts))
+
+    async def stream_model(self, guild: discord.Guild, text: str,
+                           role: Literal['user', 'assistant', 'system', 'tool'] = "user",
+                           images: Optional[Sequence[Image]] = None,
+                           channel: discord.abc.Messageable | None = None) -> AsyncIterator[str]:
+        """
+        Sends the text to the model and yields the response as it's generated.
+        Tools called by the model are run in between and their output is given back to the model.
+        Only the newest messages of the conversation that fit its token budget are sent.
+        Chats wait for their turn in the scheduler, turns of a conversation run in order.
+        :param channel: Channel of the conversation, used when every channel has its own conversation.
+
+        :exception QueueFull: raised when too many chats are waiting.
+        """
+        key = self.messages.key(guild, channel)
+        if self.cache is not None and not images and not self.scheduler.busy(key):
+            # answers from the cache don't wait for a turn, unless the conversation has one running or waiting
+            conversation = await self.messages.conversation(guild, channel)
+            message = ollama.Message(role=role, content=text)
+            cached = self.cache.get(self.__cache_key(conversation, message))
+            if cached is not None and not self.scheduler.busy(key):
+                self.messages.add_message(conversation, message)
+                self.messages.add_message(conversation, ollama.Message(role="assistant", content=cached))
+                self.logger.log(logging.DEBUG, f"Answered from the cache. Cache: {self.cache.metrics()}")
+                yield cached
+                return
+        async with self.scheduler.turn(key):
+            async for part in self.__stream_model(guild, text, role, images, channel):
+                yield part
+
+    def __cache_key(self, conversation: Conversation, message: ollama.Message) -> str:
+        """
+        Key of the response to the message, with everything the model is given before it.
+        Conversations share a response only when the model would see the same context, so nothing leaks between them.
+        """
+        return cache_key(self.__model_name, self.__options, conversation.window() + [message])
+
+    async def __stream_model(self, guild: discord.Guild, text: str, role: str, images: Optional[Sequence[Image]],
+                             channel: discord.abc.Messageable | None) -> AsyncIterator[str]:
+        conversation = await self.messages.conversation(guild, channel)
+        message = ollama.Message(role=role, content=text, images=images)
+        key = self.__cache_key(conversation, message) if self.cache is not None and not images else None
+        self.messages.add_message(conversation, message)
+        await self.wait_until_warm()
+        self.__last_used = time.monotonic()
         tools = utils.get_tools()
-        response = await self.__client.chat(model=self.__model_name, messages=self.messages[guild], tools=tools, options=self.__options)
-        while response.message.tool_calls:
-            for tool in response.message.tool_calls:
-                if function_call := self.requestables.get(tool.function.name)[0]:
-                    output = function_call(**tool.function.arguments)
-                    self.messages.add_message_args(guild=guild, text=str(output), role="tool")
-            response = await AsyncClient().chat(model=self.__model_name, messages=self.messages[guild], tools=tools, options=self.__options)
-        self.messages.add_message(guild, message=response.message)
-        return response.message
\ No newline at end of file
+        rounds = 0
+        while True:
+            rounds += 1
+            started = time.perf_counter()
+            content = []
+            tool_calls = []
+            async for part in await self.__client().chat(model=self.__model_name, messages=conversation.window(),
+                                                         tools=tools, options=self.__options,
+                                                         keep_alive=self.keep_alive, stream=True):
+                if part.message.content:
+                    content.append(part.message.content)
+                    yield part.message.content
+                if part.message.tool_calls:
+                    tool_calls.extend(part.message.tool_calls)
+                if part.done:
+                    conversation.last_prompt_tokens = part.prompt_eval_count
+            self.messages.add_message(conversation, ollama.Message(role="assistant", content="".join(content)))
+            generated = time.perf_counter()
+            if not tool_calls:
+                self.logger.log(logging.DEBUG, f"Round {rounds}: model {generated - started:.3f}s.")
+                if key is not None and rounds == 1:  # responses that used tools depend on more than the prompt
+                    self.cache.put(key, "".join(content))
+                break
+            outputs = await asyncio.gather(*(self.__call_tool(tool) for tool in tool_calls))
+            for output in outputs:
+                self.messages.add_message_args(conversation, text=output, role="tool")
+            self.logger.log(logging.DEBUG, f"Round {rounds}: model {generated - started:.3f}s, "
+                                           f"{len(tool_calls)} tools {time.perf_counter() - generated:.3f}s.")
+        self.logger.log(logging.DEBUG, f"Prompt of the conversation: {conversation.prompt_tokens()} tokens estimated, "
+                                       f"{conversation.last_prompt_tokens} counted by the model. "
+                                       f"Conversations: {self.messages.metrics()} "
+                                       f"Scheduler: {self.scheduler.metrics()}"
+                                       + (f" Cache: {self.cache.metrics()}" if self.cache is not None else ""))
+        if conversation.evicted and conversation not in self.__summaries:
+            self.__summaries[conversation] = asyncio.create_task(self.__summarize(conversation))
+
+    async def __call_tool(self, tool: ollama.Message.ToolCall) -> str:
+        """
+        Sends a tool called by the model as a request to the core that owns it.
+        :return: Output of the tool for the model, or why it couldn't be run.
+        """
+        from main.global_variables import tools
+        name = tool.function.name
+        route = tools.route(name)
+        if route is None:
+            return f"There is no tool named {name}."
+        core_name, function_name = route
+        request = utils.Request(source=self.core_name, destination=core_name, function_name=function_name,
+                                arguments=dict(tool.function.arguments), timeout=self.tool_timeout)
+        try:
+            output = await request.wait_for_response()
+        except RequestTimedOut:
+            self.logger.log(logging.WARNING, f"Tool {name} didn't finish in {self.tool_timeout}s.")
+            return f"Tool {name} didn't finish in time."
+        except RequestCancelled:
+            self.logger.log(logging.WARNING, f"Tool {name} was cancelled by {core_name}.")
+            return f"Tool {name} was cancelled."
+        except Exception as e:
+            self.logger.log(logging.ERROR, f"Tool {name} has failed.", exc_info=e)
+            return f"Tool {name} has failed: {e}"
+        return str(output)
+
+    async def __summarize(self, conversation: Conversation):
+        evicted, conversation.evicted = conversation.evicted, []
+        previous = conversation.summary.content if conversation.summary is not None else ""
+        text = "\n".join(f"{message.role}: {message.content}" for message in evicted)
+        try:
+            response = await self.__client().generate(
+                model=self.__model_name, keep_alive=self.keep_alive,
+                prompt=f"Summarize this conversation in a few sentences.\n{previous}\n{text}"
+            )
+            conversation.set_summary(response.response)
+            self.store.save_summary(conversation.key, response.response)
+            self.logger.log(logging.DEBUG, f"Summarized {len(evicted)} evicted messages.")
+        except Exception as e:
+            self.logger.log(logging.WARNING, "Couldn't summarize evicted messages.", exc_info=e)
+        finally:
+            del self.__summaries[conversation]
@@ -0,0 +1,121 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import threading
+import time
+from collections import OrderedDict, deque
+
+from main.exceptions import QueueFull
+
+
+class Ticket:
+    def __init__(self, key: str):
+        self.key = key
+        self.queued = time.monotonic()
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+
+
+class GenerationScheduler:
+    """
+    Decides when chats are sent to the model.
+    At most "concurrency" chats run at once. Each conversation waits in its own queue, and the queues take turns,
+    so a busy conversation can't starve the others.
+    Turns of a single conversation run one after another, in the order they came in.
+    It can be used from the loop of any core.
+    """
+    def __init__(self, concurrency: int = 2, max_per_conversation: int = 3, max_waiting: int = 50,
+                 samples: int = 200):
+        """
+        :param concurrency: Maximum amount of chats sent to the model at once.
+        :param max_per_conversation: Maximum amount of turns waiting in a single conversation.
+        :param max_waiting: Maximum amount of turns waiting in every conversation together.
+        :param samples: Amount of the latest wait times used by metrics.
+        """
+        self.concurrency = concurrency
+        self.max_per_conversation = max_per_conversation
+        self.max_waiting = max_waiting
+        self.rejected = 0
+        self.__queues: OrderedDict[str, deque[Ticket]] = OrderedDict()
+        self.__running: set[str] = set()
+        self.__waiting = 0
+        self.__waits: deque[float] = deque(maxlen=samples)
+        self.__lock = threading.Lock()
+
+    @contextlib.asynccontextmanager
+    async def turn(self, key: str):
+        """
+        Waits for the conversation's turn and holds it inside the with block.
+        :param key: Key of the conversation.
+
+        :exception QueueFull: raised at once when too many turns are waiting.
+        """
+        ticket = self.__enqueue(key)
+        try:
+            await asyncio.wrap_future(ticket.future)
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                self.__release(key)  # the turn was given just as the wait was cancelled
+            raise
+        try:
+            yield
+        finally:
+            self.__release(key)
+
+    def __enqueue(self, key: str) -> Ticket:
+        with self.__lock:
+            queue = self.__queues.setdefault(key, deque())
+            if self.__waiting >= self.max_waiting or len(queue) >= self.max_per_conversation:
+                self.rejected += 1
+                if not queue:
+                    del self.__queues[key]
+                raise QueueFull
+            ticket = Ticket(key)
+            queue.append(ticket)
+            self.__waiting += 1
+            self.__grant()
+            return ticket
+
+    def __release(self, key: str):
+        with self.__lock:
+            self.__running.discard(key)
+            self.__grant()
+
+    def __grant(self):
+        while len(self.__running) < self.concurrency:
+            key = next((key for key, queue in self.__queues.items() if queue and key not in self.__running), None)
+            if key is None:
+                return
+            ticket = self.__queues[key].popleft()
+            self.__waiting -= 1
+            if not self.__queues[key]:
+                del self.__queues[key]
+            else:
+                self.__queues.move_to_end(key)  # other conversations go first next time
+            if not ticket.future.set_running_or_notify_cancel():
+                continue  # the chat stopped waiting
+            self.__running.add(key)
+            self.__waits.append(time.monotonic() - ticket.queued)
+            ticket.future.set_result(None)
+
+    def busy(self, key: str) -> bool:
+        """
+        Returns if a turn of the conversation is running or waiting.
+        """
+        with self.__lock:
+            return key in self.__running or key in self.__queues
+
+    def metrics(self) -> dict[str, float | int]:
+        """
+        Returns queue depths and wait times of the latest turns in seconds.
+        """
+        with self.__lock:
+            waits = sorted(self.__waits)
+            return {
+                "running": len(self.__running),
+                "waiting": self.__waiting,
+                "max_queue_depth": max((len(queue) for queue in self.__queues.values()), default=0),
+                "rejected": self.rejected,
+                "wait_p50": waits[len(waits) // 2] if waits else 0.0,
+                "wait_p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+                "wait_max": waits[-1] if waits else 0.0,
+            }
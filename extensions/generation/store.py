@@ -0,0 +1,147 @@
+import concurrent.futures
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_conversation ON messages (conversation, id);
+CREATE TABLE IF NOT EXISTS summaries (
+    conversation TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+"""
+
+
+class ConversationStore(threading.Thread):
+    """
+    Keeps conversations with the model in a SQLite database.
+    A single thread owns the connection: messages are queued and written in batches, one transaction per batch,
+    and loads are answered by the same thread, so they always see every message queued before them.
+    """
+    def __init__(self, path: str, logger: logging.Logger, batch_size: int = 256):
+        """
+        :param path: Path to the database file. Its folder is created if needed.
+        :param logger: Logger of the core.
+        :param batch_size: Maximum amount of messages written in one transaction.
+        """
+        super().__init__(name="ConversationStore", daemon=True)
+        self.path = path
+        self.logger = logger
+        self.batch_size = batch_size
+        self.queue: queue.Queue[tuple] = queue.Queue()
+        self.written = 0
+
+    def write(self, conversation: str, role: str, content: str):
+        """
+        Queues a message to be written.
+        :param conversation: Key of the conversation.
+        """
+        self.queue.put(("write", conversation, role, content, time.time()))
+
+    def save_summary(self, conversation: str, content: str):
+        self.queue.put(("summary", conversation, content))
+
+    def load(self, conversation: str, limit: int) -> concurrent.futures.Future:
+        """
+        Loads the newest messages of the conversation and its summary.
+        :param conversation: Key of the conversation.
+        :param limit: Maximum amount of messages to load.
+        :return: Future with the summary, or None, and a list of (role, content) pairs, oldest first.
+        """
+        future = concurrent.futures.Future()
+        self.queue.put(("load", conversation, limit, future))
+        return future
+
+    def run(self):
+        connection = None
+        try:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path)
+            connection.executescript(SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            # the thread keeps running, so loads fail instead of waiting forever
+            self.logger.log(logging.ERROR, f"Couldn't open the conversation database: {self.path}", exc_info=e)
+            connection = None
+        try:
+            while True:
+                batch = [self.queue.get()]
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    pass
+                if not self.__handle(connection, batch):
+                    return
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def __handle(self, connection: sqlite3.Connection | None, batch: list[tuple]) -> bool:
+        writes = []
+        for action, *arguments in batch:
+            match action:
+                case "write":
+                    writes.append(arguments)
+                case "summary" | "load" | "stop":
+                    # messages queued before have to be in the database first
+                    self.__write(connection, writes)
+                    writes = []
+                    if action == "stop":
+                        return False
+                    try:
+                        if connection is None:
+                            raise sqlite3.OperationalError("The conversation database isn't open.")
+                        if action == "summary":
+                            with connection:
+                                connection.execute("INSERT OR REPLACE INTO summaries (conversation, content) "
+                                                   "VALUES (?, ?)", arguments)
+                        else:
+                            self.__load(connection, *arguments)
+                    except Exception as e:
+                        what = "load" if action == "load" else "save the summary of"
+                        self.logger.log(logging.ERROR, f"Couldn't {what} conversation {arguments[0]}.", exc_info=e)
+                        if action == "load" and not arguments[-1].done():
+                            arguments[-1].set_exception(e)
+        self.__write(connection, writes)
+        return True
+
+    def __write(self, connection: sqlite3.Connection | None, writes: list):
+        if not writes:
+            return
+        try:
+            if connection is None:
+                raise sqlite3.OperationalError("The conversation database isn't open.")
+            with connection:
+                connection.executemany("INSERT INTO messages (conversation, role, content, created) "
+                                       "VALUES (?, ?, ?, ?)", writes)
+            self.written += len(writes)
+        except Exception as e:
+            self.logger.log(logging.ERROR, f"Couldn't save {len(writes)} messages.", exc_info=e)
+
+    @staticmethod
+    def __load(connection: sqlite3.Connection, conversation: str, limit: int, future: concurrent.futures.Future):
+        rows = connection.execute("SELECT role, content FROM messages WHERE conversation = ? "
+                                  "ORDER BY id DESC LIMIT ?", (conversation, limit)).fetchall()
+        summary = connection.execute("SELECT content FROM summaries WHERE conversation = ?",
+                                     (conversation,)).fetchone()
+        future.set_result((summary[0] if summary is not None else None, rows[::-1]))
+
+    def stop(self):
+        """
+        Writes everything that is still in the queue and stops the thread.
+        """
+        if not self.is_alive():
+            return
+        self.queue.put(("stop",))
+        self.join()
@@ -6,3 +6,20 @@ from extensions.generation.core import Core
 @Core.not_toolable
 async def chat_with_model(core: Core, guild: discord.Guild, text: str):
     return await core.chat_model(guild=guild, text=text)
+
+
+@Core.not_toolable
+async def chat_from_discord(core: Core, guild_id: int, text: str, channel_id: int | None = None):
+    """
+    Chat of the "/ollama chat" command. When discord runs in this process the response is streamed,
+    otherwise it's returned as a whole, because only the response can be sent back.
+    """
+    from main.global_variables import threads
+    from main.network import RemoteCore
+    from main.process import ProcessCore
+    guild = discord.Object(id=guild_id)
+    channel = discord.Object(id=channel_id) if channel_id is not None else None
+    discord_core = next((thread for thread in threads if thread.core_name == "discord"), None)
+    if discord_core is not None and not isinstance(discord_core, (ProcessCore, RemoteCore)):
+        return core.stream_model(guild=guild, text=text, channel=channel)
+    return "".join([part async for part in core.stream_model(guild=guild, text=text, channel=channel)])
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from collections import OrderedDict, deque
 from typing import Literal, Optional, Sequence
 
 import discord
@@ -6,53 +8,200 @@ import ollama
 from ollama import Image
 
 import extensions.dsc.core
+from extensions.generation.store import ConversationStore
 from main.utils import Request
 
 
-class Messages(dict[discord.Guild, list[ollama.Message]]):
-    def __init__(self, core):
+def estimate_tokens(message: ollama.Message) -> int:
+    """
+    Rough amount of tokens the message takes in the prompt: about 4 characters per token and a few for the role.
+    """
+    return (len(message.content or "") + 3) // 4 + 4
+
+
+class Conversation:
+    """
+    Messages of a single conversation that fit into the model's context.
+    The system prompt is always kept, the oldest messages are evicted once the conversation is over its token budget.
+    Evicted messages can be replaced by a summary.
+    """
+    def __init__(self, budget: int, system_prompt: str | None = None, keep_evicted: bool = False, key: str = ""):
+        """
+        :param budget: Maximum amount of tokens of messages sent to the model.
+        :param system_prompt: Prompt sent as the first message of every chat.
+        :param keep_evicted: If True evicted messages are kept until they're summarized.
+        :param key: Key of the conversation in the store.
+        """
+        self.key = key
+        self.budget = budget
+        self.keep_evicted = keep_evicted
+        self.system = ollama.Message(role="system", content=system_prompt) if system_prompt else None
+        self.summary: ollama.Message | None = None
+        self.turns: deque[tuple[ollama.Message, int]] = deque()
+        self.evicted: list[ollama.Message] = []  # evicted messages that weren't summarized yet
+        self.evicted_total = 0
+        self.tokens = 0  # tokens of the turns
+        self.last_prompt_tokens: int | None = None  # tokens of the last prompt as counted by the model
+
+    def fixed_tokens(self) -> int:
+        return sum(estimate_tokens(message) for message in (self.system, self.summary) if message is not None)
+
+    def add(self, message: ollama.Message):
+        tokens = estimate_tokens(message)
+        self.turns.append((message, tokens))
+        self.tokens += tokens
+        self.__evict()
+
+    def __evict(self):
+        budget = self.budget - self.fixed_tokens()
+        # the newest message is kept even if it's over the budget alone
+        while len(self.turns) > 1 and (self.tokens > budget or self.turns[0][0].role == "tool"):
+            message, tokens = self.turns.popleft()
+            self.tokens -= tokens
+            if self.keep_evicted:
+                self.evicted.append(message)
+            self.evicted_total += 1
+
+    def set_summary(self, text: str):
+        """
+        Replaces evicted messages with their summary. The summary is cut to about a quarter of the budget.
+        """
+        self.summary = ollama.Message(role="system",
+                                      content=f"Summary of the earlier conversation: {text[:self.budget]}")
+        self.__evict()
+
+    def window(self) -> list[ollama.Message]:
+        """
+        Returns messages to send to the model.
+        """
+        fixed = [message for message in (self.system, self.summary) if message is not None]
+        return fixed + [message for message, _ in self.turns]
+
+    def prompt_tokens(self) -> int:
+        return self.fixed_tokens() + self.tokens
+
+
+class Messages(OrderedDict[str, Conversation]):
+    """
+    Conversations with the model, one per guild or, if "per_channel" is True, one per channel.
+    Conversations are kept in the store and loaded on first use.
+    Only the most recently used ones stay in memory.
+    """
+    def __init__(self, core, store: ConversationStore, budget: int = 4096, system_prompt: str | None = None,
+                 per_channel: bool = False, summarize: bool = False, max_active: int = 100):
+        """
+        :param core: Core of the generation extension.
+        :param store: Store the messages are saved to.
+        :param budget: Maximum amount of tokens of a conversation sent to the model.
+        :param system_prompt: Prompt sent as the first message of every conversation.
+        :param per_channel: If True every channel has its own conversation.
+        :param summarize: If True evicted messages are kept until the core summarizes them.
+        :param max_active: Maximum amount of conversations kept in memory.
+        """
         super().__init__()
         self.core = core
+        self.store = store
+        self.budget = budget
+        self.system_prompt = system_prompt
+        self.per_channel = per_channel
+        self.summarize = summarize
+        self.max_active = max_active
+        self.loaded = 0
+
+    def key(self, guild: discord.Guild, channel: discord.abc.Messageable | None = None) -> str:
+        if self.per_channel and channel is not None:
+            return f"{guild.id}/{channel.id}"
+        return str(guild.id)
 
     def add_guilds(self, guilds: list[discord.Guild]):
         for guild in guilds:
             self.add_guild(guild)
 
-    def add_guild(self, guild: discord.Guild):
-        if guild not in self.keys():
-            self.core.logger.log(logging.DEBUG, f"Adding new Messages subsection for guild: {guild.name}")
-            self[guild] = []
+    def add_guild(self, guild: discord.Guild, channel: discord.abc.Messageable | None = None) -> Conversation:
+        key = self.key(guild, channel)
+        if key not in self.keys():
+            self.core.logger.log(logging.DEBUG, f"Adding new conversation for: {guild.name} {key}")
+            self.__add(key, Conversation(self.budget, self.system_prompt, self.summarize, key))
+        self.move_to_end(key)
+        return self[key]
+
+    def __add(self, key: str, conversation: Conversation):
+        self[key] = conversation
+        while len(self) > self.max_active:
+            evicted, _ = self.popitem(last=False)
+            self.core.logger.log(logging.DEBUG, f"Conversation {evicted} isn't used anymore. Keeping it only in the store.")
 
-    def add_message(self, guild: discord.Guild, message: ollama.Message):
-        self.core.logger.log(logging.DEBUG, f"Adding new message to Messages subsection: {guild.name} - {str(message)}")
-        self.add_guild(guild)
+    async def conversation(self, guild: discord.Guild, channel: discord.abc.Messageable | None = None) -> Conversation:
+        """
+        Returns the conversation, it's loaded from the store if it isn't in memory.
+        """
+        key = self.key(guild, channel)
+        if key in self.keys():
+            self.move_to_end(key)
+            return self[key]
+        # messages are 4 tokens at least, more of them can't fit into the budget
+        summary, rows = await asyncio.wrap_future(self.store.load(key, self.budget // 4))
+        if key in self.keys():  # loaded by another chat in the meantime
+            return self[key]
+        conversation = Conversation(self.budget, self.system_prompt, self.summarize, key)
+        if summary is not None:
+            conversation.set_summary(summary)
+        for role, content in rows:
+            conversation.add(ollama.Message(role=role, content=content))
+        conversation.evicted.clear()  # they were summarized before, or dropped
+        self.loaded += 1
+        self.core.logger.log(logging.DEBUG, f"Loaded conversation {key} with {len(conversation.turns)} messages.")
+        self.__add(key, conversation)
+        return conversation
+
+    def add_message(self, conversation: Conversation, message: ollama.Message):
+        """
+        Adds the message to the conversation, which comes from Messages.conversation, and writes it to the store.
+        A conversation evicted from memory in the meantime is put back, so it's never replaced by an empty one.
+        """
+        self.core.logger.log(logging.DEBUG, f"Adding new message to conversation: {conversation.key} - {str(message)}")
         if len(message.content) > 0:
-            self[guild].append(message)
+            conversation.add(message)
+            self.store.write(conversation.key, message.role, message.content)
+            if self.get(conversation.key) is not conversation:
+                self.__add(conversation.key, conversation)
+            self.move_to_end(conversation.key)
+
+    def add_message_args(self, conversation: Conversation, text: str, role: Literal['user', 'assistant', 'system', 'tool'] = "user", images: Optional[Sequence[Image]] = None):
+        self.add_message(conversation, ollama.Message(role=role, content=text, images=images))
 
-    def add_message_args(self, guild: discord.Guild, text: str, role: Literal['user', 'assistant', 'system', 'tool'] = "user", images: Optional[Sequence[Image]] = None):
-        self.add_message(guild, ollama.Message(role=role, content=text, images=images))
+    def metrics(self) -> dict[str, int]:
+        """
+        Returns the size of conversations in memory together, to check the budget holds.
+        """
+        conversations = list(self.values())
+        return {
+            "conversations": len(conversations),
+            "loaded": self.loaded,
+            "written": self.store.written,
+            "messages": sum(len(conversation.turns) for conversation in conversations),
+            "characters": sum(len(message.content or "") for conversation in conversations
+                              for message in conversation.window()),
+            "max_prompt_tokens": max((conversation.prompt_tokens() for conversation in conversations), default=0),
+            "max_model_prompt_tokens": max((conversation.last_prompt_tokens or 0 for conversation in conversations),
+                                           default=0),
+            "evicted": sum(conversation.evicted_total for conversation in conversations),
+            "waiting_for_summary": sum(len(conversation.evicted) for conversation in conversations),
+        }
 
 
 async def init_discord_commands(core: extensions.dsc.core.Core):
     core.logger.log(logging.DEBUG, f"Initializing commands for discord.")
-
-    async def chat(interaction: discord.Interaction, text: str):
-        from extensions.generation import tools
-        await interaction.response.send_message(
-            content="Trying to send a message to AI..."
-        )
-        response = (await tools.chat_with_model(core, interaction.guild, text)).content
-        await interaction.edit_original_response(
-            content=str(response)
-        )
-
-    from discord.app_commands import Command
+    # only names are sent, discord builds the command itself, so it can run in another process or on another host
     Request(
         source=core.core_name,
         destination="discord",
-        function_name="create_command",
+        function_name="create_chat_command",
         arguments={
             "category_name": "ollama",
-            "command": Command(name=chat.__name__, description="Custom ollama command.", callback=chat)
+            "name": "chat",
+            "description": "Custom ollama command.",
+            "destination": core.core_name,
+            "function_name": "chat_from_discord"
         }
-    )
\ No newline at end of file
+    )
@@ -1,15 +1,17 @@
 import asyncio
+import graphlib
+import json
 import logging
 import os
-import time
 from asyncio import CancelledError
-from datetime import datetime
 
 # from inputimeout import inputimeout, TimeoutOccurred
 
 import main.exceptions
 import removalScheduler.core
 from main.global_variables import logger, threads_to_start
+from main.logs import move_log
+from main.manifest import Manifest
 from main.utils import Command, LogHandler
 
 """
@@ -20,40 +22,118 @@ TODO: Create tools for AI to interact with discord.
 
 
 async def start():
+    main.global_variables.startup_profiler.start()
     await init()
     await run()
     await end()
 
 
 async def init():
-    from main.global_variables import threads, terminate_signal, cmds
-    main.global_variables.scheduler = removalScheduler.core.Core(terminate_signal)
-    await create_logs()
+    from main.global_variables import threads, terminate_signal, cmds, startup_profiler
+    with startup_profiler.phase("logs"):
+        main.global_variables.scheduler = removalScheduler.core.Core(terminate_signal)
+        await create_logs()
+        main.global_variables.scheduler.start()
     logger.log(logging.INFO, "Initializing the main core.")
-    logger.log(logging.INFO, "Initializing all extensions...")
-    await init_extensions()
-    logger.log(logging.INFO, "All extensions loaded.")
+    with startup_profiler.phase("network"):
+        await init_network()
     from main import utils
     logger.log(logging.INFO, "Initializing commands.")
-    for file in utils.list_dir("./commands"):
-        if ".py" not in file:
-            continue
-        cmd = Command(file)
-        cmds[cmd.cmd] = cmd
-        logger.log(logging.DEBUG, f"Command loaded: {cmd.cmd}")
+    with startup_profiler.phase("commands"):
+        for file in utils.list_dir("./commands"):
+            if ".py" not in file:
+                continue
+            cmd = Command(file)
+            cmds[cmd.cmd] = cmd
+            logger.log(logging.DEBUG, f"Command loaded: {cmd.cmd}")
     logger.log(logging.INFO, f"Loaded all commands!")
     logger.log(logging.INFO, "Initialized the main core.")
     logger.log(logging.INFO, "Starting every extension.")
+    if main.global_variables.shared_loop:
+        logger.log(logging.INFO, "Extensions that aren't isolated will share the main loop.")
     for thread in threads:
-        logger.log(logging.INFO, f"Starting extension: {thread.core_name}")
+        logger.log(logging.INFO, f"Starting remote core: {thread.core_name}")
         thread.start()
+    with startup_profiler.phase("extensions"):
+        await init_extensions()
     logger.log(logging.INFO, "Started all extensions!")
+    if main.global_variables.bus_server is not None:
+        main.global_variables.bus_server.start()
+    startup_profiler.finish()
+    logger.log(logging.INFO, f"Startup report: {json.dumps(startup_profiler.report())}")
 
 
 async def init_extensions():
+    """
+    Loads and starts extensions in the order of their dependencies.
+    Every extension is started as soon as the cores it depends on are ready,
+    so extensions that don't depend on each other start at the same time.
+    Extensions whose dependencies are missing, failed or form a cycle aren't started.
+    """
     from main.utils import init_extension
-    for extension in os.listdir(os.path.join("extensions")):
-        await init_extension(extension)
+    from main.global_variables import extension_catalog, start_extensions, threads, startup_profiler
+    from main.global_variables import extension_ready_timeout
+    manifests: dict[str, Manifest] = {}
+    for manifest in extension_catalog.entries():
+        if start_extensions is not None and manifest.folder not in start_extensions:
+            logger.log(logging.DEBUG, f"Not starting extension: {manifest.core_name}")
+            continue
+        manifests[manifest.core_name] = manifest
+    while True:  # a cycle is reported at a time, there can be more of them
+        sorter = graphlib.TopologicalSorter({name: manifest.dependencies for name, manifest in manifests.items()})
+        try:
+            sorter.prepare()
+            break
+        except graphlib.CycleError as e:
+            logger.log(logging.ERROR, f"Extensions depend on each other: {' -> '.join(e.args[1])}. "
+                                      f"Not starting them.")
+            for name in e.args[1]:
+                manifests.pop(name, None)
+    started: dict[str, asyncio.Task] = {}
+
+    async def start_extension(manifest: Manifest) -> bool:
+        with startup_profiler.phase("dependencies", manifest.core_name):
+            for dependency in manifest.dependencies:
+                if dependency in started:
+                    ready = await started[dependency]
+                else:
+                    core = next((core for core in threads if core.core_name == dependency), None)
+                    ready = core is not None and await core.wait_until_ready(extension_ready_timeout)
+                    if core is not None and not ready and core.is_alive():
+                        logger.log(logging.ERROR, f"{dependency} didn't become ready in "
+                                                  f"{extension_ready_timeout}s.")
+                if not ready:
+                    logger.log(logging.ERROR, f"Not starting {manifest.core_name}: {dependency} isn't ready.")
+                    return False
+        core = await init_extension(manifest.folder)
+        if core is None:
+            return False
+        logger.log(logging.INFO, f"Starting extension: {core.core_name}")
+        with startup_profiler.phase("ready", manifest.core_name):
+            core.start()
+            ready = await core.wait_until_ready(extension_ready_timeout)
+        if not ready:
+            if core.is_alive():
+                logger.log(logging.ERROR, f"{core.core_name} didn't become ready in {extension_ready_timeout}s. "
+                                          f"Extensions depending on it aren't started.")
+            else:
+                logger.log(logging.ERROR, f"{core.core_name} stopped before it was ready.")
+        return ready
+
+    for name, manifest in manifests.items():
+        started[name] = asyncio.create_task(start_extension(manifest), name=f"start {name}")
+    await asyncio.gather(*started.values())
+
+
+async def init_network():
+    from main.global_variables import threads, terminate_signal, bus_listen, remote_cores
+    from main.network import BusServer, RemoteCore
+    if bus_listen is not None:
+        logger.log(logging.INFO, f"Offering cores to other hosts on: {bus_listen}")
+        main.global_variables.bus_server = BusServer(terminate_signal, bus_listen)
+    for core_name, address in remote_cores.items():
+        logger.log(logging.INFO, f"Adding remote core: {core_name} at {address}")
+        threads.append(RemoteCore.for_address(core_name, address, terminate_signal))
 
 
 async def create_logs():
@@ -61,18 +141,19 @@ async def create_logs():
     if ".logs" not in utils.list_dir():
         os.mkdir(".logs")
     if "current.log" in utils.list_dir(".logs"):
-        os.rename(f".logs/current.log",
-                  f".logs/{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log")
+        move_log(".logs/current.log", utils.archive_name(".logs"))
     logger.addHandler(LogHandler())
 
 
 async def run():
     try:
-        from main.global_variables import cmds, terminate_signal, threads, console_enable
+        from main.global_variables import cmds, terminate_signal, threads, console_enable, extension_ready_timeout
         logger.log(logging.INFO, "Waiting for extensions to be ready...")
-        for thread in threads:
-            logger.log(logging.DEBUG, f"Waiting for extension: {thread.core_name}")
-            await thread.wait_until_ready()
+        waiting = list(threads)
+        ready = await asyncio.gather(*(thread.wait_until_ready(extension_ready_timeout) for thread in waiting))
+        for thread, is_ready in zip(waiting, ready):
+            if not is_ready:
+                logger.log(logging.WARNING, f"{thread.core_name} isn't ready. Not waiting for it anymore.")
         while not terminate_signal.is_set():
             logger.log(logging.DEBUG, "Main loop has advanced!")
             try:
@@ -90,13 +171,12 @@ async def run():
                         continue
                     return_value = await cmds[user_input].execute()
                     if asyncio.iscoroutine(return_value):
-                        await return_value()
+                        await return_value
                     elif callable(return_value):
                         return_value()
-                    elif type(return_value) is list:
-                        print('\n'.join(return_value))
                     else:
-                        print(return_value)
+                        async for item in main.utils.Command.iterate(return_value):
+                            print(str(item).removesuffix("\n"))
                 else:
                     await asyncio.sleep(1)
                 for left in sorted(threads_to_start.keys()):
@@ -137,17 +217,23 @@ async def end():
                 alive = True
                 break
             alive = False
-        time.sleep(1)
+        await asyncio.sleep(1)
     logger.log(logging.DEBUG, f"Every extention confirmed killed.")
 
     logger.log(logging.DEBUG, f"Requesting logs clearing.")
     from main import utils
     await utils.clear_additional_logs(".logs")
     logger.log(logging.DEBUG, f"Request for logs clearing completed.")
+    if main.global_variables.bus_server is not None:
+        logger.log(logging.DEBUG, "Stopping bus server.")
+        main.global_variables.bus_server.kill()
+        while main.global_variables.bus_server.is_alive():
+            await asyncio.sleep(1)
     logger.log(logging.DEBUG, "Stopping deletion scheduler.")
     main.global_variables.scheduler.kill()
     while main.global_variables.scheduler.is_alive():
         logger.log(logging.DEBUG, f"Scheduler is confirmed to be alive. Waiting...")
-        time.sleep(1)
+        await asyncio.sleep(1)
     logger.log(logging.DEBUG, "Scheduler was stopped.")
-    logger.log(logging.INFO, "All extensions have been stopped.")
\ No newline at end of file
+    logger.log(logging.INFO, "All extensions have been stopped.")
+    utils.get_log_writer().stop()
\ No newline at end of file
@@ -33,3 +33,43 @@ class DeletionFileNotExists(BaseException):
 class IncompleteRequest(BaseException):
     def __init__(self, message="There is an incomplete request!"):
         super().__init__(message)
+
+
+class RequestTimedOut(BaseException):
+    """
+    Happens when request wasn't handled before its deadline.
+    """
+    def __init__(self, message="Request has timed out."):
+        super().__init__(message)
+
+
+class RequestCancelled(BaseException):
+    """
+    Happens when waiting for a request that was cancelled.
+    """
+    def __init__(self, message="Request was cancelled."):
+        super().__init__(message)
+
+
+class ConnectionLost(BaseException):
+    """
+    Happens when connection to a core in another process or on another host was lost while waiting for a request.
+    """
+    def __init__(self, message="Connection to the core was lost."):
+        super().__init__(message)
+
+
+class AuthenticationFailed(BaseException):
+    """
+    Happens when another host connecting to the request bus doesn't know the shared secret.
+    """
+    def __init__(self, message="Other side of the connection failed to authenticate."):
+        super().__init__(message)
+
+
+class QueueFull(BaseException):
+    """
+    Happens when too many requests are already waiting to be handled.
+    """
+    def __init__(self, message="Too many requests are waiting. Try again later."):
+        super().__init__(message)
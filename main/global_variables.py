@@ -3,18 +3,41 @@ import threading
 import uuid
 import removalScheduler
 
-from main.utils import Cores, Command, Requests
+from main.startup import StartupProfiler
+from main.tools import ToolRegistry
+from main.utils import Cores, Command, Requests, LogWriter, ExtensionCatalog
 
 threads: Cores = Cores()  # all modules
 threads_to_start: dict[int, list[str]] = {}
 
 cmds: dict[str, Command] = {}  # commands from "/commands" folder
+extension_catalog: ExtensionCatalog = ExtensionCatalog()  # extensions available in "/extensions" folder
+startup_profiler: StartupProfiler = StartupProfiler()  # timings of the program's start
+tools: ToolRegistry = ToolRegistry()  # functions of known cores the model can call
 terminate_signal: threading.Event = threading.Event()  # global terminate signal
 scheduler: removalScheduler.core.Core | None = None
+bus_server = None  # main.network.BusServer when bus_listen is set
 
 console_enable = False  # if python console should be enabled
+start_extensions: list[str] | None = None  # extensions (folder names) loaded at start, None loads every extension
+extension_ready_timeout: float | None = 60  # seconds an extension has to become ready at start, None waits forever
+process_extensions: list[str] = []  # extensions (folder names) whose cores run in a child process
+bus_listen: str | None = None  # address other hosts connect to for cores of this host: "host:port" or "unix:/path"
+remote_cores: dict[str, str] = {}  # cores running on other hosts, core name: address of their bus
+shared_loop = False  # if True every core that isn't isolated runs as a task on the main loop instead of its own thread
 no_delete = False  # if True then deletion is on hold and will not be deleted.
 
+log_queue_size = 10000  # maximum amount of log records waiting to be written to disk
+log_queue_policy = "drop"  # "drop" discards records when the queue is full, "block" waits for space
+log_format = "text"  # "text" for human readable logs, "json" for a JSON object per line
+log_segment_max_bytes = 5 * 1024 * 1024  # size after which current.log is moved aside and a new one is started
+log_segment_max_age = 24 * 60 * 60  # seconds after which current.log is moved aside and a new one is started
+log_max_bytes_per_core = 50 * 1024 * 1024  # logs of a core over this size are deleted, oldest first
+log_max_age = 14 * 24 * 60 * 60  # seconds after which logs are deleted
+log_retention_interval = 60  # seconds between compressing and deleting of old logs
+log_writer: LogWriter | None = None  # thread writing logs of every core, see main.utils.get_log_writer
+log_writer_lock: threading.Lock = threading.Lock()
+
 logger: logging.Logger = logging.getLogger(str(uuid.uuid4()))  # global logger
 logger.setLevel(logging.DEBUG)  # level of logs to save
 
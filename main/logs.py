@@ -0,0 +1,443 @@
+import bisect
+import gzip
+import itertools
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import struct
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from datetime import datetime
+from typing import NamedTuple
+
+DISCORD_LIMIT = 2000  # maximum length of a discord message
+INDEX_SUFFIX = ".idx"
+LINE_HEADER = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),(\d{3}): (\w+)\]")
+
+
+class LogReader:
+    """
+    Reads a log file line by line without loading all of it into memory.
+    Plain logs are memory mapped, compressed logs are decompressed as they are read.
+    """
+    def __init__(self, path: str):
+        """
+        :param path: Path to the log, ".gz" logs are decompressed.
+        """
+        self.path = path
+        self.compressed = path.endswith(".gz")
+
+    def __iter__(self) -> Iterator[str]:
+        return self.lines()
+
+    def lines(self, start: int = 0, end: int | None = None) -> Iterator[str]:
+        """
+        Yields lines from "start" up to, but without, "end". Lines are counted from 0.
+        """
+        if end is not None and end <= start:
+            return
+        if self.compressed:
+            with gzip.open(self.path, "rt", encoding="utf-8", errors="replace") as file:
+                yield from itertools.islice(file, start, end)
+            return
+        with open(self.path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                position = 0
+                for _ in range(start):
+                    position = mapped.find(b"\n", position) + 1
+                    if position == 0:
+                        return
+                yield from self.__read(mapped, position, None if end is None else end - start)
+
+    def tail(self, count: int) -> Iterator[str]:
+        """
+        Yields the last "count" lines.
+        """
+        if count <= 0:
+            return
+        if self.compressed:
+            with gzip.open(self.path, "rt", encoding="utf-8", errors="replace") as file:
+                yield from deque(file, maxlen=count)
+            return
+        with open(self.path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                position = size - 1 if mapped[size - 1:size] == b"\n" else size
+                for _ in range(count):
+                    position = mapped.rfind(b"\n", 0, position)
+                    if position == -1:
+                        break
+                yield from self.__read(mapped, position + 1, count)
+
+    def offset(self, start: int, count: int) -> Iterator[str]:
+        """
+        Yields "count" lines starting from line "start".
+        """
+        return self.lines(start, start + count)
+
+    def window(self, since: "str | datetime | None" = None, until: "str | datetime | None" = None) -> Iterator[str]:
+        """
+        Yields records from the time window. The log's index is used to jump to the start of the window.
+        :param since: Time of the first record, ISO format.
+        :param until: Time of the last record, ISO format.
+
+        :exception ValueError: raised when a time isn't in ISO format.
+        """
+        return self.__window(parse_time(since), parse_time(until))
+
+    def __window(self, start: float | None, end: float | None) -> Iterator[str]:
+        offset = LogIndex(self.path).seek(start) if start is not None else 0
+        opener = gzip.open if self.compressed else open
+        with opener(self.path, "rb") as file:
+            file.seek(offset)
+            created: float | None = None
+            for raw in file:
+                line = raw.decode("utf-8", errors="replace")
+                info = parse_line(line)
+                if info is not None:
+                    created = info[0]
+                if created is None or (start is not None and created < start):
+                    continue
+                if end is not None and created > end:
+                    return
+                yield line
+
+    @staticmethod
+    def __read(mapped: mmap.mmap, position: int, count: int | None) -> Iterator[str]:
+        read = 0
+        while position < len(mapped) and (count is None or read < count):
+            end = mapped.find(b"\n", position)
+            end = len(mapped) if end == -1 else end + 1
+            yield mapped[position:end].decode("utf-8", errors="replace")
+            position = end
+            read += 1
+
+
+class MessagePacker:
+    """
+    Joins lines into messages no longer than "limit", as they're added.
+    Lines longer than the limit are split into several messages.
+    """
+    def __init__(self, limit: int = DISCORD_LIMIT):
+        self.limit = limit
+        self.__message: list[str] = []
+        self.__length = 0
+
+    def add(self, line: str) -> list[str]:
+        """
+        Returns messages that are full after adding the line.
+        """
+        messages = []
+        while len(line) > self.limit:
+            messages.extend(self.finish())
+            messages.append(line[:self.limit])
+            line = line[self.limit:]
+        if self.__length + len(line) > self.limit:
+            messages.extend(self.finish())
+        self.__message.append(line)
+        self.__length += len(line)
+        return messages
+
+    def finish(self) -> list[str]:
+        """
+        Returns what's left as the last message.
+        """
+        if not self.__message:
+            return []
+        message = "".join(self.__message)
+        self.__message, self.__length = [], 0
+        return [message]
+
+
+def pack_messages(lines: Iterable[str], limit: int = DISCORD_LIMIT) -> Iterator[str]:
+    """
+    Joins lines into messages no longer than "limit", as they're read.
+    """
+    packer = MessagePacker(limit)
+    for line in lines:
+        yield from packer.add(line)
+    yield from packer.finish()
+
+
+async def pack_messages_async(lines: AsyncIterable[str], limit: int = DISCORD_LIMIT) -> AsyncIterator[str]:
+    """
+    Joins lines into messages no longer than "limit", as they're produced.
+    """
+    packer = MessagePacker(limit)
+    async for line in lines:
+        for message in packer.add(line):
+            yield message
+    for message in packer.finish():
+        yield message
+
+
+def level_bit(level: int) -> int:
+    """
+    Bit of the level in the levels bitmap of an index block.
+    """
+    return 1 << min(max(level // 10, 0), 7)
+
+
+def levels_from(level: int) -> int:
+    """
+    Bitmap of the level and every level above it.
+    """
+    bits = 0
+    for bit in range(min(max(level // 10, 0), 7), 8):
+        bits |= 1 << bit
+    return bits
+
+
+def index_path(log_file: str) -> str:
+    return f"{log_file.removesuffix('.gz')}{INDEX_SUFFIX}"
+
+
+def move_log(log_file: str, target: str, copy: bool = False):
+    """
+    Moves or copies the log together with its index.
+    """
+    move = shutil.copyfile if copy else os.rename
+    move(log_file, target)
+    if os.path.exists(index_path(log_file)):
+        move(index_path(log_file), index_path(target))
+
+
+class IndexBlock(NamedTuple):
+    offset: int  # where the block starts in the uncompressed log
+    length: int
+    first: float  # timestamp of the first record
+    last: float  # timestamp of the last record
+    levels: int  # bitmap of levels of the records, see level_bit
+
+
+class LogIndex:
+    """
+    Sparse index of a log, stored next to it with the ".idx" suffix.
+    Every entry describes a block of records: where it is, its time span and what levels it contains.
+    It's written by LogHandler as records are written, so searches only read blocks that can match.
+    """
+    entry = struct.Struct("<QIddB")
+    block_size = 64 * 1024
+
+    def __init__(self, log_file: str, mode: str = "r", offset: int = 0):
+        """
+        :param log_file: Log the index belongs to.
+        :param mode: "r" to read, "w" to start a new index and "a" to add to an existing one.
+        :param offset: Size of the log when the index is opened for writing.
+        """
+        self.log_file = log_file
+        self.path = index_path(log_file)
+        self.__file = open(self.path, mode + "b") if mode != "r" else None
+        self.__start = offset
+        self.__length = 0
+        self.__first: float | None = None
+        self.__last: float | None = None
+        self.__levels = 0
+
+    def add(self, created: float, level: int, size: int):
+        """
+        Adds a written record to the current block.
+        :param created: Timestamp of the record.
+        :param level: Level of the record.
+        :param size: Bytes the record took in the log.
+        """
+        if self.__first is None:
+            self.__first = created
+        self.__last = created
+        self.__levels |= level_bit(level)
+        self.__length += size
+        if self.__length >= self.block_size:
+            self.close_block()
+
+    def close_block(self):
+        if self.__length == 0:
+            return
+        self.__file.write(self.entry.pack(self.__start, self.__length, self.__first, self.__last, self.__levels))
+        self.__start += self.__length
+        self.__length, self.__first, self.__last, self.__levels = 0, None, None, 0
+
+    def flush(self):
+        self.__file.flush()
+
+    def close(self):
+        self.close_block()
+        self.__file.close()
+
+    def blocks(self) -> list[IndexBlock]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as file:
+            data = file.read()
+        size = len(data) - len(data) % self.entry.size
+        return [IndexBlock(*entry) for entry in self.entry.iter_unpack(data[:size])]
+
+    def span(self) -> tuple[float, float] | None:
+        """
+        Returns time of the first and the last indexed record, None if nothing is indexed.
+        """
+        blocks = self.blocks()
+        if len(blocks) == 0:
+            return None
+        return blocks[0].first, blocks[-1].last
+
+    def seek(self, since: float) -> int:
+        """
+        Binary searches the offset of the first block that can have records from "since" on.
+        Reading from the offset skips everything older without reading it.
+        """
+        blocks = sorted(self.blocks())
+        if len(blocks) == 0 or blocks[0].offset > 0:
+            return 0
+        i = bisect.bisect_left(blocks, since, key=lambda block: block.last)
+        if i == len(blocks):
+            return blocks[-1].offset + blocks[-1].length  # only records that aren't indexed yet can match
+        return blocks[i].offset
+
+    def regions(self, size: int | None, since: float | None = None, until: float | None = None,
+                levels: int | None = None) -> list[tuple[int, int]]:
+        """
+        Returns (offset, length) of every part of the log that can contain matching records.
+        Parts of the log that aren't indexed yet are always returned.
+        :param size: Uncompressed size of the log. None trusts the index to cover the whole log,
+        a log without an index is then returned whole with length -1.
+        """
+        blocks = sorted(self.blocks())
+        if size is None and len(blocks) == 0:
+            return [(0, -1)]
+        regions = []
+        position = 0
+        for block in blocks:
+            if block.offset > position:
+                regions.append((position, block.offset - position))
+            position = max(position, block.offset + block.length)
+            if since is not None and block.last < since:
+                continue
+            if until is not None and block.first > until:
+                continue
+            if levels is not None and not block.levels & levels:
+                continue
+            regions.append((block.offset, block.length))
+        if size is not None and size > position:
+            regions.append((position, size - position))
+        return regions
+
+
+class SearchResult(NamedTuple):
+    log_file: str
+    line: str
+
+    def __str__(self):
+        return f"{self.log_file}: {self.line}"
+
+
+def parse_time(value: str | datetime | None) -> float | None:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+def log_files(logs_folder: str = ".logs") -> list[str]:
+    """
+    Returns every log in the folder and folders of the cores, oldest first.
+    """
+    files = []
+    for current_folder, _, names in os.walk(logs_folder):
+        for name in names:
+            if name.endswith(".log") or name.endswith(".log.gz"):
+                files.append(os.path.join(current_folder, name))
+    return sorted(files, key=os.path.getmtime)
+
+
+def search(pattern: str, level: int | str | None = None, since: str | datetime | None = None,
+           until: str | datetime | None = None, limit: int | None = 50,
+           logs_folder: str = ".logs") -> Iterator[SearchResult]:
+    """
+    Searches logs of every core using their indexes, only blocks that can match are read.
+    :param pattern: Regular expression searched in every line.
+    :param level: Lowest level of the records. Name or number.
+    :param since: Only records from this time, ISO format.
+    :param until: Only records up to this time, ISO format.
+    :param limit: Maximum amount of results, None for no limit.
+    :param logs_folder: Folder with the logs.
+    """
+    expression = re.compile(pattern)
+    block_expression = re.compile(pattern, re.MULTILINE)  # skips blocks without a match before splitting lines
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown level: {level}")
+    start, end = parse_time(since), parse_time(until)
+    levels = levels_from(level) if level is not None else None
+    found = 0
+    for log_file in log_files(logs_folder):
+        if start is not None and os.path.getmtime(log_file) < start:
+            continue
+        # seeking in a compressed log means decompressing it, so its index has to be trusted
+        compressed = log_file.endswith(".gz")
+        regions = LogIndex(log_file).regions(None if compressed else os.path.getsize(log_file), start, end, levels)
+        if len(regions) == 0:
+            continue
+        opener = gzip.open if compressed else open
+        with opener(log_file, "rb") as file:
+            for offset, length in regions:
+                file.seek(offset)
+                text = file.read(length).decode("utf-8", errors="replace")
+                if not block_expression.search(text):
+                    continue
+                for line in _filter_lines(text, expression, level, start, end):
+                    yield SearchResult(log_file, line)
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return
+
+
+def parse_line(line: str, with_time: bool = True) -> tuple[float | None, int | None] | None:
+    """
+    Reads time and level of a record from its first line, text or JSON.
+    :param with_time: If False, time isn't parsed from text lines, which is the slow part.
+    :return: (time, level) or None for lines that don't start a record, like tracebacks.
+    """
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        level = logging.getLevelName(record.get("level"))
+        return record.get("time"), level if isinstance(level, int) else None
+    header = LINE_HEADER.match(line)
+    if header is None:
+        return None
+    level = logging.getLevelName(header.group(3))
+    created = None
+    if with_time:
+        created = datetime.strptime(header.group(1), "%Y-%m-%d %H:%M:%S").timestamp() + int(header.group(2)) / 1000
+    return created, level if isinstance(level, int) else None
+
+
+def _filter_lines(text: str, expression: re.Pattern, level: int | None, since: float | None,
+                  until: float | None) -> Iterator[str]:
+    created: float | None = None
+    levelno: int | None = None
+    with_time = since is not None or until is not None
+    for line in text.splitlines():
+        info = parse_line(line, with_time)
+        if info is not None:
+            created, levelno = info
+        # lines that don't start a record, like tracebacks, belong to the record above them
+        if level is not None and (levelno is None or levelno < level):
+            continue
+        if since is not None and (created is None or created < since):
+            continue
+        if until is not None and (created is None or created > until):
+            continue
+        if expression.search(line):
+            yield line
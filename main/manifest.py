@@ -0,0 +1,96 @@
+import ast
+import os
+from typing import NamedTuple
+
+import yaml
+
+MANIFEST_FILE = "manifest.yaml"
+DEFAULT_ENTRY = "core:Core"
+DECORATORS = {"requestable", "not_toolable"}
+
+
+class Manifest(NamedTuple):
+    """
+    Description of an extension that is known without importing it.
+    """
+    folder: str  # folder of the extension in "extensions"
+    core_name: str
+    entry: str = DEFAULT_ENTRY  # "module:Class" of the extension's core
+    dependencies: tuple[str, ...] = ()  # names of cores that have to be ready before this one starts
+    requestables: tuple[str, ...] = ()
+    in_process: bool = False  # True when the extension sends objects that can't be pickled, like callbacks, to cores
+
+    @property
+    def entry_module(self) -> str:
+        return self.entry.split(":", maxsplit=1)[0]
+
+    @property
+    def entry_class(self) -> str:
+        return self.entry.split(":", maxsplit=1)[1]
+
+
+def read_manifest(extensions_folder: str, folder: str) -> Manifest | None:
+    """
+    Reads "manifest.yaml" of the extension. Extensions without one are described by static analysis of their code.
+    :param extensions_folder: Folder with the extensions.
+    :param folder: Folder of the extension.
+    :return: Manifest or None if the folder isn't an extension.
+
+    :exception ValueError: raised when the manifest is missing the name of the core.
+    """
+    path = os.path.join(extensions_folder, folder)
+    if "__" in folder or not os.path.isfile(os.path.join(path, "__init__.py")):
+        return None
+    if not os.path.isfile(os.path.join(path, MANIFEST_FILE)):
+        return extract_manifest(extensions_folder, folder)
+    with open(os.path.join(path, MANIFEST_FILE), "r") as file:
+        data = yaml.safe_load(file) or {}
+    if not isinstance(data.get("name"), str):
+        raise ValueError(f"Manifest of {folder} doesn't have a name.")
+    return Manifest(folder=folder, core_name=data["name"], entry=data.get("entry", DEFAULT_ENTRY),
+                    dependencies=tuple(data.get("dependencies") or ()),
+                    requestables=tuple(data.get("requestables") or ()), in_process=bool(data.get("in_process")))
+
+
+def extract_manifest(extensions_folder: str, folder: str, entry: str = DEFAULT_ENTRY) -> Manifest | None:
+    """
+    Finds the name of the core and requestable functions in the extension's code without running it.
+    Dependencies can't be found this way, extensions with dependencies need a manifest.
+    :param extensions_folder: Folder with the extensions.
+    :param folder: Folder of the extension.
+    :param entry: "module:Class" of the extension's core.
+    :return: Manifest or None if the entry class doesn't set core_name.
+    """
+    path = os.path.join(extensions_folder, folder)
+    module_name, class_name = entry.split(":", maxsplit=1)
+    core_name = None
+    requestables = []
+    for file in sorted(os.listdir(path)):
+        if not file.endswith(".py"):
+            continue
+        with open(os.path.join(path, file), "rb") as source:
+            try:
+                tree = ast.parse(source.read(), filename=file)
+            except SyntaxError:
+                return None
+        for node in tree.body:
+            if file == f"{module_name}.py" and isinstance(node, ast.ClassDef) and node.name == class_name:
+                core_name = _class_core_name(node)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and _is_requestable(node):
+                requestables.append(node.name)
+    if core_name is None:
+        return None
+    return Manifest(folder=folder, core_name=core_name, entry=entry, requestables=tuple(requestables))
+
+
+def _class_core_name(node: ast.ClassDef) -> str | None:
+    for statement in node.body:
+        if isinstance(statement, ast.Assign) and isinstance(statement.value, ast.Constant) and \
+                any(isinstance(target, ast.Name) and target.id == "core_name" for target in statement.targets):
+            return statement.value.value if isinstance(statement.value.value, str) else None
+    return None
+
+
+def _is_requestable(node: ast.FunctionDef | ast.AsyncFunctionDef) -> bool:
+    return any(isinstance(decorator, ast.Attribute) and decorator.attr in DECORATORS
+               for decorator in node.decorator_list)
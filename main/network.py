@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+from typing import Callable
+
+from main import transport, utils
+from main.exceptions import *
+
+NONCE_SIZE = 32
+
+
+def parse_address(address: str) -> tuple[str, str | int]:
+    """
+    Parses address of a request bus.
+    :param address: "host:port" for TCP or "unix:/path/to/socket" for an Unix socket.
+    :return: ("unix", path) or (host, port).
+    """
+    if address.startswith("unix:"):
+        return "unix", address.removeprefix("unix:")
+    host, port = address.rsplit(":", maxsplit=1)
+    return host.strip("[]"), int(port)
+
+
+def get_secret() -> bytes:
+    """
+    Shared secret of every host on the bus, taken from the "BUS_SECRET" environment variable.
+    """
+    return os.getenv("BUS_SECRET", "").encode()
+
+
+async def open_connection(address: str) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    host, port = parse_address(address)
+    if host == "unix":
+        return await asyncio.open_unix_connection(port)
+    return await asyncio.open_connection(host, port)
+
+
+async def handshake(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, secret: bytes, role: str,
+                    timeout: float = 5):
+    """
+    Both sides prove they know the secret before any frame is unpickled.
+    Each side sends a nonce and answers the other's nonce with an HMAC bound to its role.
+    :param role: "server" or "client".
+
+    :exception AuthenticationFailed: raised when the other side doesn't know the secret.
+    """
+    other_role = "client" if role == "server" else "server"
+    nonce = secrets.token_bytes(NONCE_SIZE)
+    writer.write(nonce)
+    await writer.drain()
+    other_nonce = await asyncio.wait_for(reader.readexactly(NONCE_SIZE), timeout)
+    writer.write(hmac.new(secret, role.encode() + other_nonce, hashlib.sha256).digest())
+    await writer.drain()
+    digest = await asyncio.wait_for(reader.readexactly(hashlib.sha256().digest_size), timeout)
+    if not hmac.compare_digest(digest, hmac.new(secret, other_role.encode() + nonce, hashlib.sha256).digest()):
+        raise AuthenticationFailed
+
+
+class BusServer(utils.Core):
+    """
+    Offers every core of this program to other hosts.
+    Requests received over a connection are put on the local bus and answered over the same connection.
+    """
+    core_name = "bus"
+
+    def __init__(self, terminate_signal: threading.Event, address: str, **kwargs):
+        """
+        :param terminate_signal: Event that is given to each core to terminate the entire program if needed.
+        :param address: Address to listen on. "host:port" or "unix:/path/to/socket".
+        """
+        self.address = address
+        self.__server: asyncio.Server | None = None
+        self.__peers: set[transport.Peer] = set()
+        super().__init__(terminate_signal, **kwargs)
+
+    async def call(self):
+        await super().call()
+        if not get_secret():
+            # frames are unpickled, anyone able to connect without the secret could run code as this program
+            self.logger.log(logging.ERROR, "BUS_SECRET is not set. Refusing to listen for other hosts.")
+            return
+        host, port = parse_address(self.address)
+        if host == "unix":
+            if os.path.exists(port):
+                os.remove(port)
+            self.__server = await asyncio.start_unix_server(self.__accept, port)
+            os.chmod(port, 0o600)  # only the user running the program can connect
+        else:
+            self.__server = await asyncio.start_server(self.__accept, host, port)
+        self.logger.log(logging.INFO, f"Listening for other hosts on: {self.address}")
+
+    async def __accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        remote = writer.get_extra_info("peername")
+        try:
+            await handshake(reader, writer, get_secret(), "server")
+        except (AuthenticationFailed, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError) as e:
+            self.logger.log(logging.WARNING, f"Rejected connection from {remote}: {e!r}")
+            writer.close()
+            return
+        self.logger.log(logging.INFO, f"Accepted connection from {remote}")
+        peer = transport.Peer(reader, writer, self.logger)
+        peer.on_message = lambda message: self.__on_message(peer, message)
+        self.__peers.add(peer)
+        try:
+            await peer.serve()
+        finally:
+            self.__peers.discard(peer)
+            self.logger.log(logging.INFO, f"Connection from {remote} was closed.")
+
+    @staticmethod
+    def __on_message(peer: transport.Peer, message: tuple):
+        if message[0] == "ping":
+            peer.send(("pong", BusServer.status(), BusServer.tools()))
+
+    @staticmethod
+    def status() -> dict[str, bool]:
+        """
+        Returns readiness of every core running on this host.
+        """
+        from main.global_variables import threads
+        return {core.core_name: core.is_set() for core in threads if not isinstance(core, RemoteCore)}
+
+    @staticmethod
+    def tools() -> dict[str, dict[str, dict]]:
+        """
+        Returns schemas of the tools of every core running on this host, by the name of the core.
+        """
+        from main.global_variables import threads, tools
+        return {core.core_name: tools.tools(core.core_name) for core in threads if not isinstance(core, RemoteCore)}
+
+    async def stay_alive(self):
+        await super().stay_alive()
+        if self.__server is not None:
+            self.__server.close()
+        for peer in list(self.__peers):
+            peer.close()
+        if self.__server is not None:
+            await self.__server.wait_closed()
+
+
+class ConnectionPool:
+    """
+    Keeps a few authenticated connections to another host open.
+    Every connection carries many requests at once, new requests go to the least busy one.
+    Connections are checked with heartbeats and replaced when the other side stops answering.
+    """
+    def __init__(self, address: str, size: int, logger: logging.Logger,
+                 on_message: Callable[[transport.Peer, tuple], None]):
+        self.address = address
+        self.size = size
+        self.logger = logger
+        self.on_message = on_message
+        self.peers: list[transport.Peer] = []
+        self.__tasks: set[asyncio.Task] = set()
+
+    def pick(self) -> transport.Peer | None:
+        return min((peer for peer in self.peers if not peer.closed), key=len, default=None)
+
+    async def maintain(self, killed: Callable[[], bool], heartbeat: float):
+        """
+        Opens missing connections, sends heartbeats and drops connections that missed three of them.
+        """
+        while not killed():
+            self.peers = [peer for peer in self.peers if not peer.closed]
+            for peer in self.peers:
+                if time.monotonic() - peer.last_seen > heartbeat * 3:
+                    self.logger.log(logging.WARNING, f"Connection to {self.address} missed heartbeats. Closing.")
+                    peer.close(ConnectionLost())
+                else:
+                    peer.send(("ping",))
+            while len(self.peers) < self.size and not killed():
+                try:
+                    await self.__connect()
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, AuthenticationFailed) as e:
+                    self.logger.log(logging.DEBUG, f"Couldn't connect to {self.address}: {e!r}")
+                    break
+            await asyncio.sleep(heartbeat)
+        self.close()
+
+    async def __connect(self):
+        if not get_secret():
+            raise AuthenticationFailed("BUS_SECRET is not set.")
+        reader, writer = await asyncio.wait_for(open_connection(self.address), 5)
+        try:
+            await handshake(reader, writer, get_secret(), "client")
+        except BaseException:
+            writer.close()
+            raise
+        peer = transport.Peer(reader, writer, self.logger)
+        peer.on_message = lambda message: self.on_message(peer, message)
+        task = asyncio.create_task(peer.serve())
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+        self.peers.append(peer)
+        self.logger.log(logging.INFO, f"Connected to {self.address}")
+        peer.send(("ping",))
+
+    def close(self):
+        for peer in self.peers:
+            peer.close()
+        self.peers.clear()
+
+
+class RemoteCore(utils.Core):
+    """
+    Stand-in for a core running on another host.
+    It lives in the known modules like any other core and forwards every request sent to it over the network.
+    It's ready while the other host reports the core as ready.
+    """
+    address = ""
+    pool_size = 2
+    heartbeat = 5
+
+    def __init__(self, terminate_signal: threading.Event, **kwargs):
+        """
+        Use RemoteCore.for_address to create one.
+        :param terminate_signal: Event that is given to each core to terminate the entire program if needed.
+        """
+        self.__pool: ConnectionPool | None = None
+        self.__maintainer: asyncio.Task | None = None
+        self.__backlog: list[utils.Request] = []
+        self.__schemas: dict[str, dict] = {}  # tools of the core, as the other host sent them last
+        super().__init__(terminate_signal, **kwargs)
+
+    @classmethod
+    def for_address(cls, core_name: str, address: str, terminate_signal: threading.Event, **kwargs):
+        """
+        Creates the stand-in core.
+        :param core_name: Name of the core on the other host.
+        :param address: Address of the other host's bus server. "host:port" or "unix:/path/to/socket".
+        :param terminate_signal: Event that is given to each core to terminate the entire program if needed.
+        """
+        core_class = type(f"{core_name.capitalize()}RemoteCore", (cls,), {"core_name": core_name,
+                                                                           "address": address})
+        return core_class(terminate_signal, **kwargs)
+
+    def __init_logs__(self, mode: str, logger_name):
+        # the other host owns the core's log folder
+        from main.global_variables import logger
+        self.logger = logger
+
+    async def call(self):
+        await super().call()
+        self.__pool = ConnectionPool(self.address, self.pool_size, self.logger, self.__on_message)
+        self.__maintainer = asyncio.create_task(self.__pool.maintain(self.killed, self.heartbeat))
+
+    async def loop(self):
+        pass  # readiness comes from the other host
+
+    def __on_message(self, peer: transport.Peer, message: tuple):
+        if message[0] != "pong":
+            return
+        schemas = message[2].get(self.core_name, {}) if len(message) > 2 else {}
+        if schemas != self.__schemas:  # heartbeats repeat them, the registry is only changed when they do
+            from main.global_variables import tools
+            tools.add_schemas(self.core_name, schemas)
+            self.__schemas = schemas
+        if message[1].get(self.core_name, False):
+            self.set()
+            backlog, self.__backlog = self.__backlog, []
+            for request in backlog:
+                peer.forward(request)
+
+    async def get_requests(self):
+        from main import global_variables
+        for request in global_variables.requests.pop(self.core_name):
+            peer = self.__pool.pick() if self.__pool is not None else None
+            if peer is None or not self.is_set():
+                self.__backlog.append(request)
+            else:
+                peer.forward(request)
+
+    async def stay_alive(self):
+        await super().stay_alive()
+        if self.__pool is not None:
+            self.__pool.close()
+        for request in self.__backlog:
+            request.fail(ConnectionLost())
+        self.__backlog.clear()
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+
+from main import transport, utils
+from main.exceptions import *
+
+
+class ProcessCore(utils.Core):
+    """
+    Stand-in for an extension's core that runs in a child process.
+    It lives in the known modules like any other core and forwards every request sent to it over a socket,
+    so blocking work of the extension can't stall the rest of the program.
+    If the child process crashes, waiting requests fail with ConnectionLost and the child is started again.
+    """
+    isolated = True
+    extension = ""
+    max_restart_delay = 30
+
+    def __init__(self, terminate_signal: threading.Event, **kwargs):
+        """
+        Use ProcessCore.for_extension to create one.
+        :param terminate_signal: Event that is given to each core to terminate the entire program if needed.
+        :param kwargs: Parameters passed down to the extension's core in the child process.
+        """
+        self.__kwargs = kwargs
+        self.__process: multiprocessing.Process | None = None
+        self.__peer: transport.Peer | None = None
+        self.__backlog: list[utils.Request] = []
+        self.__supervisor: asyncio.Task | None = None
+        super().__init__(terminate_signal)
+
+    @classmethod
+    def for_extension(cls, extension: str, core_name: str, terminate_signal: threading.Event, **kwargs):
+        """
+        Creates the stand-in core for the extension.
+        :param extension: Folder of the extension in "extensions".
+        :param core_name: Name of the extension's core.
+        :param terminate_signal: Event that is given to each core to terminate the entire program if needed.
+        """
+        core_class = type(f"{core_name.capitalize()}ProcessCore", (cls,), {"core_name": core_name,
+                                                                            "extension": extension})
+        return core_class(terminate_signal, **kwargs)
+
+    def __init_logs__(self, mode: str, logger_name):
+        # the child process owns the extension's log folder
+        from main.global_variables import logger
+        self.logger = logger
+
+    async def call(self):
+        await super().call()
+        self.__supervisor = asyncio.create_task(self.__supervise())
+
+    async def loop(self):
+        pass  # readiness comes from the child process
+
+    async def __supervise(self):
+        delay = 1
+        while not self.killed():
+            await self.__run_child()
+            if self.killed():
+                break
+            self.logger.log(logging.ERROR, f"Process of {self.core_name} has stopped "
+                                           f"with code {self.__process.exitcode}. Restarting in {delay}s.")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+
+    async def __run_child(self):
+        parent_socket, child_socket = socket.socketpair()
+        context = multiprocessing.get_context("spawn")
+        self.__process = context.Process(target=child_main, args=(self.extension, child_socket, self.__kwargs),
+                                         name=self.core_name, daemon=True)
+        self.__process.start()
+        child_socket.close()
+        self.logger.log(logging.INFO, f"Started process of {self.core_name}: {self.__process.pid}")
+        reader, writer = await asyncio.open_connection(sock=parent_socket)
+        self.__peer = transport.Peer(reader, writer, self.logger, on_message=self.__on_message)
+        await self.__peer.serve()
+        self.__peer = None
+        await asyncio.to_thread(self.__process.join, 5)
+
+    def __on_message(self, message: tuple):
+        if message[0] == "ready":
+            self.logger.log(logging.INFO, f"Process of {self.core_name} is ready.")
+            from main.global_variables import tools
+            tools.add_schemas(self.core_name, message[1])  # the functions themselves are in the child
+            self.set()
+            backlog, self.__backlog = self.__backlog, []
+            for request in backlog:
+                self.__peer.forward(request)
+
+    async def get_requests(self):
+        from main import global_variables
+        for request in global_variables.requests.pop(self.core_name):
+            if self.__peer is None or self.__peer.closed or not self.is_set():
+                self.__backlog.append(request)
+            else:
+                self.__peer.forward(request)
+
+    async def stay_alive(self):
+        await super().stay_alive()
+        if self.__peer is not None:
+            self.__peer.send(("kill",))
+        if self.__process is not None:
+            await asyncio.to_thread(self.__process.join, 10)
+            if self.__process.is_alive():
+                self.logger.log(logging.WARNING, f"Process of {self.core_name} didn't stop. Terminating.")
+                self.__process.terminate()
+        for request in self.__backlog:
+            request.fail(ConnectionLost())
+        self.__backlog.clear()
+
+
+def child_main(extension: str, connection: socket.socket, kwargs: dict):
+    """
+    Entry point of the child process. Loads the extension and serves requests for it.
+    """
+    asyncio.run(_serve_extension(extension, connection, kwargs))
+
+
+async def _serve_extension(extension: str, connection: socket.socket, kwargs: dict):
+    import removalScheduler.core  # noqa: F401 - global_variables expects it to be imported
+    from main import global_variables
+    reader, writer = await asyncio.open_connection(sock=connection)
+    core: utils.Core | None = None
+
+    def on_message(message: tuple):
+        if message[0] == "kill" and core is not None:
+            core.kill()
+
+    peer = transport.Peer(reader, writer, global_variables.logger, on_message=on_message)
+    global_variables.requests.default_route = peer.forward  # every other core lives in the parent
+    core = await utils.init_extension(extension, **kwargs)
+    if core is None:
+        os._exit(1)
+    core.start()
+    serving = asyncio.create_task(peer.serve())
+    while not core.is_set() and core.is_alive() and not serving.done():
+        await asyncio.sleep(0.1)
+    if core.is_set():
+        peer.send(("ready", global_variables.tools.tools(core.core_name)))
+    while core.is_alive() and not serving.done():
+        await asyncio.sleep(0.1)
+    core.kill()
+    while core.is_alive():
+        await asyncio.sleep(0.1)
+    peer.close()
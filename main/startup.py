@@ -0,0 +1,118 @@
+import contextlib
+import threading
+import time
+from typing import Any, NamedTuple
+
+
+class Phase(NamedTuple):
+    name: str
+    extension: str | None  # core name of the extension, None for phases of the main core
+    start: float  # seconds since the program started
+    duration: float
+
+
+class StartupProfiler:
+    """
+    Times phases of the program's start, per extension and per imported module.
+    Phases can be recorded from any thread, extensions record their own phases like logging in or preloading.
+    Once the start is finished, imports aren't recorded anymore and a phase is only recorded the first time,
+    so reloading extensions later doesn't make the report grow.
+    """
+    def __init__(self):
+        self.__started = time.perf_counter()
+        self.__finished: float | None = None
+        self.__phases: list[Phase] = []
+        self.__recorded: set[tuple[str, str | None]] = set()  # name and extension of every recorded phase
+        self.__imports: dict[str, float] = {}
+        self.__lock = threading.Lock()
+
+    def start(self):
+        """
+        Marks the start of the program. Times of phases are relative to it.
+        """
+        with self.__lock:
+            self.__started = time.perf_counter()
+            self.__finished = None
+            self.__phases.clear()
+            self.__recorded.clear()
+            self.__imports.clear()
+
+    def finish(self):
+        """
+        Marks the moment every extension was started.
+        """
+        self.__finished = time.perf_counter() - self.__started
+
+    @property
+    def finished(self) -> bool:
+        return self.__finished is not None
+
+    @contextlib.contextmanager
+    def phase(self, name: str, extension: str | None = None):
+        """
+        Times the code inside the with block.
+        :param name: Name of the phase.
+        :param extension: Core name of the extension the phase belongs to.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter(), extension)
+
+    def record(self, name: str, start: float, end: float, extension: str | None = None):
+        """
+        Records a phase that was timed elsewhere.
+        :param start: time.perf_counter() at the start of the phase.
+        :param end: time.perf_counter() at the end of the phase.
+        """
+        with self.__lock:
+            if self.finished and (name, extension) in self.__recorded:
+                return
+            self.__recorded.add((name, extension))
+            self.__phases.append(Phase(name, extension, start - self.__started, end - start))
+
+    def record_import(self, module: str, duration: float):
+        """
+        Records how long importing a module took, including modules it imported for the first time.
+        """
+        with self.__lock:
+            if not self.finished:
+                self.__imports[module] = duration
+
+    def report(self) -> dict[str, Any]:
+        """
+        Returns the timings as a structure that can be written as JSON.
+        """
+        with self.__lock:
+            phases = sorted(self.__phases, key=lambda phase: phase.start)
+            imports = sorted(self.__imports.items(), key=lambda item: item[1], reverse=True)
+        extensions: dict[str, dict[str, float]] = {}
+        for phase in phases:
+            if phase.extension is not None:
+                extensions.setdefault(phase.extension, {})[phase.name] = round(phase.duration, 4)
+        return {
+            "total": round(self.__finished, 4) if self.__finished is not None else None,
+            "phases": [{"name": phase.name, "start": round(phase.start, 4), "duration": round(phase.duration, 4)}
+                       for phase in phases if phase.extension is None],
+            "extensions": extensions,
+            "imports": {module: round(duration, 4) for module, duration in imports},
+        }
+
+    def lines(self, imports: int = 10) -> list[str]:
+        """
+        Returns the report as readable lines.
+        :param imports: Amount of the slowest imports to list.
+        """
+        report = self.report()
+        total = f"{report['total']:.3f}s" if report["total"] is not None else "still starting"
+        lines = [f"Startup: {total}"]
+        for phase in report["phases"]:
+            lines.append(f"  {phase['name']}: {phase['duration']:.3f}s (at {phase['start']:.3f}s)")
+        for extension, phases in report["extensions"].items():
+            lines.append(f"  {extension}: " + ", ".join(f"{name} {duration:.3f}s" for name, duration in phases.items()))
+        if report["imports"]:
+            lines.append("Slowest imports:")
+            for module, duration in list(report["imports"].items())[:imports]:
+                lines.append(f"  {module}: {duration:.3f}s")
+        return lines
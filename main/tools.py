@@ -0,0 +1,130 @@
+import inspect
+import re
+import threading
+import types
+import typing
+from typing import Any, Callable
+
+JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", tuple: "array",
+              dict: "object"}
+PARAM_PATTERN = re.compile(r"^\s*:param (\w+):\s*(.*)$")
+
+
+SEPARATOR = "__"  # models accept only letters, digits, "_" and "-" in names of tools
+
+
+def qualified_name(core_name: str, function_name: str) -> str:
+    return f"{core_name}{SEPARATOR}{function_name}"
+
+
+def function_schema(name: str, function: Callable) -> dict[str, Any]:
+    """
+    Describes the function as a tool for the model, from its signature and docstring.
+    The "core" parameter is left out, it's given by the core handling the request.
+    :param name: Name of the tool.
+    """
+    description, descriptions = _parse_docstring(inspect.getdoc(function) or "")
+    properties = {}
+    required = []
+    for parameter in inspect.signature(function).parameters.values():
+        if parameter.name == "core" or parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        properties[parameter.name] = {"type": _json_type(parameter.annotation)}
+        if parameter.name in descriptions:
+            properties[parameter.name]["description"] = descriptions[parameter.name]
+        if parameter.default is parameter.empty:
+            required.append(parameter.name)
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {"type": "object", "properties": properties, "required": required},
+        },
+    }
+
+
+def _json_type(annotation) -> str:
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        arguments = [argument for argument in typing.get_args(annotation) if argument is not type(None)]
+        annotation = arguments[0] if len(arguments) == 1 else annotation
+    return JSON_TYPES.get(typing.get_origin(annotation) or annotation, "string")
+
+
+def _parse_docstring(docstring: str) -> tuple[str, dict[str, str]]:
+    description = []
+    parameters = {}
+    for line in docstring.splitlines():
+        match = PARAM_PATTERN.match(line)
+        if match:
+            parameters[match.group(1)] = match.group(2)
+        elif not parameters and not line.lstrip().startswith(":"):
+            description.append(line.strip())
+    return " ".join(line for line in description if line), parameters
+
+
+class ToolRegistry:
+    """
+    Tools the model can call, kept per core.
+    Names are qualified with the name of the core, so extensions can't shadow each other's functions.
+    Schemas are built once, when a core is added, and calls are routed to the core that owns the function.
+    """
+    def __init__(self):
+        self.__tools: dict[str, dict[str, dict[str, Any]]] = {}  # core name: qualified name: schema
+        self.__routes: dict[str, tuple[str, str]] = {}  # qualified name: core name, function name
+        self.__schemas: list[dict[str, Any]] | None = None
+        self.__lock = threading.Lock()
+
+    def add(self, core_name: str, requestables: dict[str, tuple[Callable, bool]]):
+        """
+        Registers the toolable functions of the core, replacing the ones it had before.
+        :param requestables: Functions registered by the core itself, see Core.get_requestable.
+        """
+        self.add_schemas(core_name, {name: function_schema(qualified_name(core_name, name), function)
+                                     for name, (function, toolable) in requestables.items() if toolable})
+
+    def add_schemas(self, core_name: str, schemas: dict[str, dict[str, Any]]):
+        """
+        Registers tools of a core whose functions aren't in this process, replacing the ones it had before.
+        :param schemas: Schemas by the name of the function, see ToolRegistry.tools of the process running the core.
+        """
+        with self.__lock:
+            self.__remove(core_name)
+            if schemas:
+                self.__tools[core_name] = {qualified_name(core_name, name): schema
+                                           for name, schema in schemas.items()}
+                for name in schemas:
+                    self.__routes[qualified_name(core_name, name)] = (core_name, name)
+            self.__schemas = None
+
+    def tools(self, core_name: str) -> dict[str, dict[str, Any]]:
+        """
+        Returns schemas of the core's tools by the name of the function, to be sent to another process.
+        """
+        with self.__lock:
+            return {self.__routes[name][1]: schema for name, schema in self.__tools.get(core_name, {}).items()}
+
+    def remove(self, core_name: str):
+        with self.__lock:
+            self.__remove(core_name)
+            self.__schemas = None
+
+    def __remove(self, core_name: str):
+        for name in self.__tools.pop(core_name, {}):
+            self.__routes.pop(name, None)
+
+    def schemas(self) -> list[dict[str, Any]]:
+        """
+        Returns schemas of every registered tool. The list is shared, it must not be changed.
+        """
+        with self.__lock:
+            if self.__schemas is None:
+                self.__schemas = [schema for tools in self.__tools.values() for schema in tools.values()]
+            return self.__schemas
+
+    def route(self, name: str) -> tuple[str, str] | None:
+        """
+        :param name: Qualified name of the tool.
+        :return: Name of the core and of its function, or None if there is no such tool.
+        """
+        return self.__routes.get(name)
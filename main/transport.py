@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import pickle
+import struct
+import time
+from typing import Any, Callable
+
+from main.exceptions import *
+
+HEADER = struct.Struct("!I")  # length of the frame that follows
+MAX_FRAME = 64 * 1024 * 1024
+
+
+def encode(message: tuple) -> bytes:
+    """
+    Serializes a message into a length prefixed frame.
+    """
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple:
+    """
+    Reads a single message written by encode.
+    :exception asyncio.IncompleteReadError: raised when the other side has closed the connection.
+    """
+    size, = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if size > MAX_FRAME:
+        raise ConnectionError(f"Frame is too big: {size} bytes.")
+    return pickle.loads(await reader.readexactly(size))
+
+
+class Peer:
+    """
+    One side of a connection that carries requests between two request buses.
+    Requests forwarded to the other side are resolved when its response arrives,
+    requests received from the other side are put on the local bus and answered when they're handled.
+    Many requests can be in flight at once, responses are matched by request id.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, logger: logging.Logger,
+                 on_message: Callable[[tuple], Any] | None = None):
+        """
+        :param reader: Stream to read frames from.
+        :param writer: Stream to write frames to.
+        :param logger: Logger of the core owning the connection.
+        :param on_message: Called with every message that isn't a part of the request protocol.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.logger = logger
+        self.on_message = on_message
+        self.loop = asyncio.get_running_loop()
+        self.__pending: dict[str, Any] = {}  # requests sent to the other side
+        self.__handling: dict[str, Any] = {}  # requests received from the other side
+        self.__tasks: set[asyncio.Task] = set()
+        self.closed = False
+        self.last_seen = time.monotonic()  # when the last frame from the other side arrived
+
+    def __len__(self):
+        return len(self.__pending)
+
+    def send(self, message: tuple):
+        if self.closed:
+            raise ConnectionError("Connection is closed.")
+        self.writer.write(encode(message))
+
+    def forward(self, request):
+        """
+        Sends the request to the other side. Safe to call from any thread.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.__forward(request)
+        else:
+            self.loop.call_soon_threadsafe(self.__forward, request)
+
+    def __forward(self, request):
+        if request.is_set():
+            return
+        key = str(request.request_id)
+        try:
+            self.send(("request", key, request.source_name, request.destination_name, request.function_name,
+                       request.arguments, request.remaining()))
+        except Exception as e:
+            self.logger.log(logging.ERROR, f"Couldn't forward request: {request}", exc_info=e)
+            request.fail(e)
+            return
+        self.__pending[key] = request
+        request.add_done_callback(lambda done: self.__forwarded_done(key, done))
+
+    def __forwarded_done(self, key: str, request):
+        if not request.cancelled():
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.__cancel, key)
+        except RuntimeError:
+            pass  # loop is already closed
+
+    def __cancel(self, key: str):
+        if self.__pending.pop(key, None) is not None and not self.closed:
+            self.send(("cancel", key))
+
+    async def serve(self):
+        """
+        Reads messages until the connection is closed.
+        """
+        try:
+            while True:
+                message = await read_frame(self.reader)
+                self.last_seen = time.monotonic()
+                match message[0]:
+                    case "request":
+                        self.__receive(*message[1:])
+                    case "response":
+                        if (request := self.__pending.pop(message[1], None)) is not None:
+                            request.response(message[2])
+                    case "error":
+                        if (request := self.__pending.pop(message[1], None)) is not None:
+                            request.fail(message[2])
+                    case "cancel":
+                        if (request := self.__handling.get(message[1])) is not None:
+                            request.cancel()
+                    case _:
+                        if self.on_message is not None:
+                            self.on_message(message)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.logger.log(logging.DEBUG, "Connection was closed by the other side.")
+        finally:
+            self.close(ConnectionLost())
+
+    def __receive(self, key: str, source: str, destination: str, function_name: str, arguments: dict,
+                  timeout: float | None):
+        from main.utils import Request
+        request = Request(source=source, destination=destination, function_name=function_name, arguments=arguments,
+                          timeout=timeout)
+        self.__handling[key] = request
+        task = asyncio.create_task(self.__answer(key, request))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __answer(self, key: str, request):
+        try:
+            response = await request.wait_for_response()
+            message = ("response", key, response)
+        except (Exception, RequestTimedOut, RequestCancelled) as e:
+            message = ("error", key, e)
+        finally:
+            self.__handling.pop(key, None)
+        if self.closed:
+            return
+        try:
+            self.send(message)
+        except Exception as e:
+            self.logger.log(logging.ERROR, f"Couldn't send response of request: {request}", exc_info=e)
+            self.send(("error", key, RuntimeError(f"Response couldn't be serialized: {e}")))
+
+    def close(self, exception: BaseException | None = None):
+        """
+        Closes the connection and fails every request that is still waiting for the other side.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        for request in self.__pending.values():
+            request.fail(exception if exception is not None else ConnectionLost())
+        self.__pending.clear()
+        for request in self.__handling.values():
+            request.cancel()
+        self.__handling.clear()
+        self.writer.close()
@@ -1,22 +1,29 @@
 import asyncio
+import atexit
+import collections
+import concurrent.futures
 import importlib.util
 import inspect
+import json
 import logging
 import os.path
 import pkgutil
-import shutil
+import queue
+import re
 import sys
 import threading
 import time
 import tracemalloc
 import uuid
-from collections.abc import Iterable
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable
 
 import yaml
 
 from main.exceptions import *
+from main.logs import LogIndex, move_log
+from main.manifest import MANIFEST_FILE, Manifest, read_manifest
 
 
 def list_dir(folder: str = "."):
@@ -29,11 +36,25 @@ def list_dir(folder: str = "."):
     return to_return
 
 
+def archive_name(logs_folder: str) -> str:
+    """
+    Returns a free path for a log that is no longer current, named after the current time.
+    """
+    name = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    path = f"{logs_folder}/{name}.log"
+    i = 1
+    while os.path.exists(path) or os.path.exists(f"{path}.gz"):
+        path = f"{logs_folder}/{name}_{i}.log"
+        i += 1
+    return path
+
+
 async def clear_additional_logs(logs_folder):
     logs = []
     for file in list_dir(logs_folder):
-        if ".log" in file:
+        if (file.endswith(".log") or file.endswith(".log.gz")) and file != "current.log":
             logs.append(f"{logs_folder}/{file}")
+    logs.sort(key=os.path.getmtime)  # oldest first
     from main.global_variables import scheduler
     while len(logs) > 5:
         from removalScheduler.core import DeletionReason
@@ -42,14 +63,205 @@ async def clear_additional_logs(logs_folder):
     await scheduler.clear_scheduler()
 
 
-class LogHandler(logging.FileHandler):
+class LogWriter(threading.Thread):
+    """
+    Single thread that writes records of every LogHandler to disk.
+    Handlers only put records into a bounded queue, so a slow disk never blocks the loop of a core.
+    Records are formatted and written in batches and every file is flushed once per batch.
+    """
+    def __init__(self, max_size: int = 10000, policy: str = "drop", batch_size: int = 512):
+        """
+        :param max_size: Maximum amount of records waiting to be written.
+        :param policy: What happens when the queue is full. "drop" discards the record, "block" waits for space.
+        :param batch_size: Maximum amount of records written before files are flushed.
+        """
+        super().__init__(name="LogWriter", daemon=True)
+        self.queue: queue.Queue[tuple[str, "LogHandler", logging.LogRecord | None]] = queue.Queue(max_size)
+        self.policy = policy
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.__stopped = False
+        self.__lock = threading.Lock()  # guards "dropped" and makes sure nothing is queued after the stop
+
+    def put(self, action: str, handler: "LogHandler", record: logging.LogRecord | None = None):
+        with self.__lock:
+            if not self.__stopped:
+                if self.policy == "block" or action != "write":
+                    self.queue.put((action, handler, record))
+                    return
+                try:
+                    self.queue.put_nowait((action, handler, record))
+                except queue.Full:
+                    self.dropped += 1
+                return
+        self.__handle_now(action, handler, record)
+
+    @staticmethod
+    def __handle_now(action: str, handler: "LogHandler", record: logging.LogRecord | None):
+        if action == "write":
+            handler.write(record)
+            handler.flush_stream()
+        elif action == "close":
+            handler.close_stream()
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            touched: set[LogHandler] = set()
+            for action, handler, record in batch:
+                match action:
+                    case "write":
+                        handler.write(record)
+                        touched.add(handler)
+                    case "close":
+                        touched.discard(handler)
+                        handler.close_stream()
+                    case "stop":
+                        self.__flush(touched)
+                        return
+            with self.__lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped > 0:
+                for handler in touched:
+                    # through the formatter, so logs in the JSON format stay a JSON object per line
+                    handler.write(logging.makeLogRecord({
+                        "name": "LogWriter", "levelno": logging.WARNING, "levelname": "WARNING",
+                        "msg": f"[{dropped} log records were dropped, logs were written too fast]"
+                    }))
+            self.__flush(touched)
+
+    @staticmethod
+    def __flush(handlers: Iterable["LogHandler"]):
+        for handler in handlers:
+            try:
+                handler.flush_stream()
+            except (OSError, ValueError):
+                pass
+
+    def stop(self):
+        """
+        Writes everything that is still in the queue and stops the thread.
+        """
+        with self.__lock:
+            if self.__stopped:
+                return
+            self.__stopped = True  # records from now on are written by the thread that logs them
+            alive = self.is_alive()
+            if alive:
+                self.queue.put(("stop", None, None))
+        if alive:
+            self.join()
+        while True:  # anything the thread didn't get to, before handlers are closed
+            try:
+                action, handler, record = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if handler is not None:
+                self.__handle_now(action, handler, record)
+
+
+def get_log_writer() -> LogWriter:
+    """
+    Returns the writer thread shared by every LogHandler, starting it if needed.
+    """
+    from main import global_variables
+    with global_variables.log_writer_lock:
+        if global_variables.log_writer is None:
+            global_variables.log_writer = LogWriter(global_variables.log_queue_size, global_variables.log_queue_policy)
+            global_variables.log_writer.start()
+            atexit.register(global_variables.log_writer.stop)
+        return global_variables.log_writer
+
+
+class LogHandler(logging.Handler):
+    rotate_retry = 60  # seconds before moving the log aside is tried again after it failed
+
     def __init__(self, core_name: str | None = None, mode: str = "w", log_level: int = logging.DEBUG):
+        super().__init__(log_level)
         if core_name is not None:
-            super().__init__(filename=f".logs/{core_name}/current.log", encoding='utf-8', mode=mode)
+            self.baseFilename = os.path.abspath(f".logs/{core_name}/current.log")
         else:
-            super().__init__(filename=f".logs/current.log", encoding='utf-8', mode=mode)
-        self.setLevel(log_level)
-        self.setFormatter(CustomFormatter())
+            self.baseFilename = os.path.abspath(f".logs/current.log")
+        self.mode = mode
+        self.stream = open(self.baseFilename, mode=mode + "b")
+        from main import global_variables
+        if global_variables.log_format == "json":
+            self.setFormatter(JsonFormatter(core_name if core_name is not None else "main"))
+        else:
+            self.setFormatter(CustomFormatter())
+        self.max_bytes: int = global_variables.log_segment_max_bytes
+        self.max_age: float = global_variables.log_segment_max_age
+        self.__size = os.path.getsize(self.baseFilename)
+        self.__opened = time.time()
+        self.__retry_at = 0.0  # time.time() before which the log isn't moved aside again
+        self.index = LogIndex(self.baseFilename, mode, self.__size)
+        self.__writer = get_log_writer()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            # the message is built now, arguments may change before the writer gets to it
+            record.msg = record.getMessage()
+            record.args = None
+            self.__writer.put("write", self, record)
+        except Exception:
+            self.handleError(record)
+
+    def write(self, record: logging.LogRecord):
+        """
+        Called by the writer thread.
+        """
+        try:
+            self.write_text(self.format(record), record.created, record.levelno)
+            if (self.__size >= self.max_bytes or record.created - self.__opened >= self.max_age) and \
+                    record.created >= self.__retry_at:
+                self.rotate()
+        except Exception:
+            self.handleError(record)
+
+    def write_text(self, text: str, created: float, level: int):
+        data = (text + "\n").encode("utf-8")
+        self.stream.write(data)
+        self.index.add(created, level, len(data))
+        self.__size += len(data)
+
+    def rotate(self):
+        """
+        Moves the current log aside and starts a new one. Called by the writer thread.
+        The scheduler compresses and eventually deletes the moved log.
+        """
+        self.close_stream()
+        try:
+            move_log(self.baseFilename, archive_name(os.path.dirname(self.baseFilename)))
+        except OSError:
+            if os.path.exists(self.baseFilename):
+                # the log couldn't be moved, e.g. it's open for reading on Windows. Keep writing to it for now
+                self.stream = open(self.baseFilename, mode="ab")
+                self.index = LogIndex(self.baseFilename, "a", self.__size)
+                self.__retry_at = time.time() + self.rotate_retry
+                raise
+            # only the index wasn't moved, the new log starts with a new index anyway
+        self.stream = open(self.baseFilename, mode="wb")
+        self.index = LogIndex(self.baseFilename, "w")
+        self.__size = 0
+        self.__opened = time.time()
+
+    def flush_stream(self):
+        self.stream.flush()
+        self.index.flush()
+
+    def close_stream(self):
+        if not self.stream.closed:
+            self.index.close()
+            self.stream.close()
+
+    def close(self):
+        self.__writer.put("close", self)
+        super().close()
 
 
 class CustomFormatter(logging.Formatter):
@@ -63,20 +275,137 @@ class CustomFormatter(logging.Formatter):
         logging.CRITICAL: format
     }
 
+    def __init__(self):
+        super().__init__()
+        self.__formatters = {level: logging.Formatter(log_fmt) for level, log_fmt in self.FORMATS.items()}
+        self.__default = logging.Formatter(self.FORMATS[logging.DEBUG])
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
+        return self.__formatters.get(record.levelno, self.__default).format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats every record as a single JSON line, so logs can be parsed by tools.
+    "request_id" and "latency" are added when they are passed to the logger in "extra".
+    """
+    def __init__(self, core_name: str):
+        super().__init__()
+        self.core_name = core_name
+
+    def format(self, record):
+        entry = {
+            "time": record.created,
+            "asctime": self.formatTime(record),
+            "level": record.levelname,
+            "core": self.core_name,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+        }
+        for field in ("request_id", "latency"):
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class Locale:
+    """
+    Strings of a core loaded from its locale file.
+    The file is parsed once and every string is split into text and placeholders ahead of time.
+    It's parsed again only when its modification time changes.
+    """
+    placeholder = re.compile(r"%(\w+)%")
+    check_interval = 1  # seconds between checks of the file's modification time
+
+    def __init__(self, path: str, logger: logging.Logger):
+        """
+        :param path: Path to the YAML file with the strings.
+        :param logger: Logger of the core.
+        """
+        self.path = path
+        self.logger = logger
+        self.__strings: dict[str, Any] = {}
+        self.__templates: dict[str, str | tuple[tuple[str, ...], tuple[str, ...]]] = {}
+        self.__mtime: int | None = None
+        self.__checked: float | None = None
+        self.__loaded = False
+
+    @classmethod
+    def compile(cls, text: str) -> str | tuple[tuple[str, ...], tuple[str, ...]]:
+        """
+        Splits the string into text parts and placeholder names in between them.
+        Strings without placeholders are returned as they should be sent.
+        """
+        parts = cls.placeholder.split(text)
+        if len(parts) == 1:
+            return text.replace("\n ", "\n")
+        return tuple(parts[0::2]), tuple(parts[1::2])
+
+    def reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        self.__checked = time.monotonic()
+        if self.__loaded and mtime == self.__mtime:
+            return
+        self.__loaded = True
+        self.__mtime = mtime
+        if mtime is None:
+            self.logger.log(logging.INFO, "Locale doesn't exists for this module.")
+            self.logger.log(logging.DEBUG, f"Locale path: {self.path}")
+            self.__strings, self.__templates = {}, {}
+            return
+        with open(self.path, "r") as file:
+            strings = yaml.safe_load(file) or {}
+        self.__templates = {key: self.compile(value) for key, value in strings.items() if type(value) is str}
+        self.__strings = strings
+        self.logger.log(logging.DEBUG, f"Loaded locale: {self.path}")
+
+    def __check(self):
+        if self.__checked is None or time.monotonic() - self.__checked >= self.check_interval:
+            self.reload()
+
+    def get_strings(self) -> dict[str, Any]:
+        self.__check()
+        return self.__strings
+
+    def get_string(self, target: str, **replaces) -> str:
+        self.__check()
+        template = self.__templates.get(target)
+        if template is None:
+            if target in self.__strings:
+                return "THIS SHOULD NOT HAPPEN! PLEASE CONTANT HELP FOR THIS BOT ON WHAT HAPPENED!"
+            return target
+        if type(template) is str:
+            return template
+        texts, names = template
+        result = [texts[0]]
+        for name, text in zip(names, texts[1:]):
+            result.append(str(replaces[name]) if name in replaces else f"%{name}%")
+            result.append(text)
+        return "".join(result).replace("\n ", "\n")
 
 
 class Core(threading.Thread):
     core_name = ""
     requestables = {}
+    isolated = False  # if True the core always runs in its own thread, even when global_variables.shared_loop is set
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # every core keeps its own functions, functions of parent classes stay visible to it
+        cls.requestables = collections.ChainMap({}, cls.requestables)
+
     def __init__(self, terminate_signal: threading.Event, mode: str = "w", logger_name: str | None = None):
         """
         Common core for all the modules inside this program. This function is supposed to be overwritten by creating a subclass.
         It has 3 main functions to overwrite with passing to the super class: call, loop, stay_alive.
         It's a subclass of the Thread. It will not block the main thread.
+        When global_variables.shared_loop is set, it runs as a task on the main loop instead, unless "isolated" is True.
         :param terminate_signal: Event that is given to each core to terminate the entire program if needed.
         :param mode: Mode for Log Handler. "w" means overwrite, while "a" applies it to the next log.
 
@@ -92,6 +421,9 @@ class Core(threading.Thread):
         self.__ready: threading.Event = threading.Event()
         self.__logs_folder: str = f".logs/{self.core_name}"
         self.__log_handler: LogHandler = None
+        self.__request_tasks: set[asyncio.Task] = set()
+        self.__task: asyncio.Task | None = None
+        self.__locale: Locale | None = None
         self.__init_logs__(mode, logger_name)
         self.logger.log(logging.INFO, "Module has been initialized.")
         self.logger.log(logging.DEBUG, f"Parameters:")
@@ -103,9 +435,42 @@ class Core(threading.Thread):
     def __start(self):
         asyncio.run(self.__call())
 
+    def start(self) -> None:
+        """
+        Starts the core in its own thread or, in the shared loop mode, as a task on the running loop.
+        """
+        from main import global_variables
+        if self.isolated or not global_variables.shared_loop:
+            super().start()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.logger.log(logging.WARNING, "No running loop to share. Starting in a separate thread.")
+            super().start()
+            return
+        self.logger.log(logging.DEBUG, "Starting on the shared loop.")
+        self.__task = loop.create_task(self.__call(), name=self.core_name)
+        self.__task.add_done_callback(self.__task_done)
+
+    def __task_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.log(logging.ERROR, "Module has crashed.", exc_info=task.exception())
+
+    def is_alive(self) -> bool:
+        if self.__task is not None:
+            return not self.__task.done()
+        return super().is_alive()
+
+    def started(self) -> bool:
+        """
+        Returns if the core was started, in its own thread or on the shared loop.
+        """
+        return self.__task is not None or self.ident is not None
+
 
     async def __call(self) -> None:
-        threading.Thread(target=self.__get_requests, daemon=True).start()
+        self.__requests_task = asyncio.create_task(self.__get_requests())
         await asyncio.create_task(self.call())
         await asyncio.create_task(self.__loop())
         await asyncio.create_task(self.stay_alive())
@@ -137,6 +502,8 @@ class Core(threading.Thread):
         while not self.killed():
             await asyncio.sleep(1)
 
+        if not os.path.isdir(self.__logs_folder):
+            return
         self.logger.log(logging.INFO, "Clearing all additional logs.")
         try:
             await clear_additional_logs(self.__logs_folder)
@@ -159,55 +526,54 @@ class Core(threading.Thread):
         """
         return self.__ready.is_set()
 
-    async def wait_until_ready(self) -> None:
+    async def wait_until_ready(self, timeout: float | None = None) -> bool:
         """
         It will wait for the current module to send a signal that it is ready.
         Use this coroutine in the main module to wait for the modules to start.
-        :return:
+        Waiting stops early if the module is killed or stops running before it's ready.
+        :param timeout: Seconds to wait for at most. None waits until the module is ready.
+        :return: If the module is ready.
         """
-        if not self.is_set():
-            self.logger.log(logging.DEBUG, "Waiting for the module to be ready.")
-            return
+        if self.is_set():
+            return True
+        self.logger.log(logging.DEBUG, "Waiting for the module to be ready.")
+        deadline = time.monotonic() + timeout if timeout is not None else None
         while not self.is_set():
-            await asyncio.sleep(1)
+            if self.killed() or (self.started() and not self.is_alive()):
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
 
     def __init_logs__(self, mode: str, logger_name):
         if self.core_name not in list_dir(".logs"):
             os.mkdir(self.__logs_folder)
         if "current.log" in list_dir(self.__logs_folder) and mode is not None:
-            if mode == "a":
-                shutil.copyfile(f"{self.__logs_folder}/current.log",
-                                f"{self.__logs_folder}/{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log")
-            else:
-                os.rename(f"{self.__logs_folder}/current.log",
-                          f"{self.__logs_folder}/{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log")
+            move_log(f"{self.__logs_folder}/current.log", archive_name(self.__logs_folder), copy=mode == "a")
         self.__log_handler = LogHandler(core_name=self.core_name, mode=mode if mode is not None else "a")
         self.logger = logging.getLogger(logger_name if logger_name is not None else str(uuid.uuid4()))
         if self.__log_handler not in self.logger.handlers:
             self.logger.setLevel(logging.DEBUG)
             self.logger.addHandler(self.__log_handler)
 
+    @property
+    def locale(self) -> "Locale":
+        """
+        Strings of the core from "locale_us.yaml" next to the file of its class.
+        """
+        if self.__locale is None:
+            self.__locale = Locale(
+                os.path.join(os.path.dirname(os.path.realpath(inspect.getfile(self.__class__))), "locale_us.yaml"),
+                self.logger
+            )
+        return self.__locale
+
     async def get_locale(self):
-        locale = os.path.join(os.path.dirname(os.path.realpath(inspect.getfile(self.__class__))), "locale_us.yaml")
-        if not os.path.exists(locale):
-            self.logger.log(logging.INFO, "Locale doesn't exists for this module.")
-            self.logger.log(logging.DEBUG, f"Locale path: {locale}")
-            self.logger.log(logging.DEBUG, f"Current directory: {os.curdir}")
-            return {}
-        with open(locale, "r") as file:
-            return yaml.safe_load(file)
+        return self.locale.get_strings()
 
     async def get_string(self, target: str, **replaces):
-        try:
-            to_return = (await self.get_locale())[target]
-        except KeyError:
-            return target
-        if type(to_return) is not str:
-            return "THIS SHOULD NOT HAPPEN! PLEASE CONTANT HELP FOR THIS BOT ON WHAT HAPPENED!"
-        for to_replace in replaces.keys():
-            to_return = to_return.replace(f"%{to_replace}%", str(replaces[to_replace]))
-        to_return = to_return.replace("\n ", "\n")
-        return to_return
+        return self.locale.get_string(target, **replaces)
 
     async def unload(self):
         self.logger.log(logging.INFO, "Unloading extension.")
@@ -227,40 +593,75 @@ class Core(threading.Thread):
     def kill(self):
         self.__terminate_signal.set()
 
-    def __get_requests(self):
-        while not self.killed():
-            asyncio.run(self.get_requests())
-            time.sleep(1)
+    async def __get_requests(self):
+        """
+        Waits on the request bus and handles requests as soon as they arrive.
+        The bus wakes this coroutine on the core's own loop, so no polling is involved.
+        """
+        from main import global_variables
+        event = asyncio.Event()
+        global_variables.requests.subscribe(self.core_name, asyncio.get_running_loop(), event)
+        try:
+            while not self.killed():
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=1)
+                except asyncio.TimeoutError:
+                    continue
+                event.clear()
+                await self.get_requests()
+        finally:
+            global_variables.requests.unsubscribe(self.core_name, event)
 
     async def get_requests(self):
+        """
+        Handles every request waiting on the bus for this core.
+        Each request runs in its own task, so it can be cancelled by the source without stopping the others.
+        """
         from main import global_variables
+        for request in global_variables.requests.pop(self.core_name):
+            self.logger.log(logging.DEBUG, f"Handling request: {request}")
+            await self.handle_request(request)
+
+    async def handle_request(self, request: "Request"):
+        if request.cancelled():
+            self.logger.log(logging.DEBUG, f"Request was cancelled before it was handled: {request.request_id}")
+            return
+        if request.expired():
+            request.fail(RequestTimedOut())
+            return
+        if request.function_name not in self.requestables.keys():
+            request.response(f"No function found by the name of {request.function_name}")
+            return
+        function = self.requestables[request.function_name][0]
+        if "core" in inspect.getfullargspec(function).annotations.keys():
+            request.arguments["core"] = self
+        task = asyncio.create_task(self.__run_request(function, request))
+        self.__request_tasks.add(task)
+        task.add_done_callback(self.__request_tasks.discard)
+        request.attach(task)
+
+    async def __run_request(self, function, request: "Request"):
         try:
-            self.logger.log(logging.DEBUG, "Checking for new requests!")
-            for request in global_variables.requests[self.core_name]:
-                global_variables.requests.remove(request)
-                if request.function_name in self.requestables.keys():
-                    if "core" in inspect.getfullargspec(self.requestables[request.function_name][0]).annotations.keys():
-                        request.arguments["core"] = self
-                    if inspect.iscoroutinefunction(self.requestables[request.function_name][0]):
-                        try:
-                            request.response(await self.requestables[request.function_name][0](**request.arguments))
-                        except Exception as e:
-                            print(e)
-                            self.logger.log(logging.ERROR, e, exc_info=e)
-                        finally:
-                            request.set()
-                    elif inspect.isfunction(self.requestables[request.function_name][0]):
-                        try:
-                            request.response(self.requestables[request.function_name][0](**request.arguments))
-                        except Exception as e:
-                            print(e)
-                            self.logger.log(logging.ERROR, e, exc_info=e)
-                        finally:
-                            request.set()
-                else:
-                    request.response(f"No function found by the name of {request.function_name}")
-        except ValueError as e:
-            print(e)
+            if inspect.iscoroutinefunction(function):
+                request.response(await asyncio.wait_for(function(**request.arguments), request.remaining()))
+            else:
+                # blocking functions would stall the loop, which is shared by every core in the shared loop mode
+                request.response(await asyncio.wait_for(asyncio.to_thread(function, **request.arguments),
+                                                        request.remaining()))
+            self.logger.log(logging.DEBUG, f"Request {request.function_name} was handled.",
+                            extra={"request_id": str(request.request_id),
+                                   "latency": time.monotonic() - request.created})
+        except asyncio.CancelledError:
+            self.logger.log(logging.DEBUG, f"Request was cancelled: {request.request_id}")
+            request.cancel()
+        except asyncio.TimeoutError:
+            self.logger.log(logging.WARNING, f"Request has timed out: {request.request_id}")
+            request.fail(RequestTimedOut())
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except BaseException as e:  # exceptions of this program derive from BaseException
+            self.logger.log(logging.ERROR, e, exc_info=e)
+            request.fail(e)
 
     @classmethod
     def requestable(cls, func):
@@ -273,7 +674,12 @@ class Core(threading.Thread):
         return func
 
     @classmethod
-    def get_requestable(cls):
+    def get_requestable(cls, inherited: bool = True):
+        """
+        :param inherited: If False only functions registered by this class itself are returned.
+        """
+        if not inherited and isinstance(cls.requestables, collections.ChainMap):
+            return cls.requestables.maps[0]
         return cls.requestables
 
 
@@ -282,6 +688,13 @@ class Cores(list[Core]):
         from main.global_variables import logger
         logger.log(logging.INFO, f"Core {core.core_name} has been added to known modules.")
         super().append(core)
+        from main.global_variables import tools
+        tools.add(core.core_name, core.get_requestable(inherited=False))
+
+    def remove(self, core: Core):
+        super().remove(core)
+        from main.global_variables import tools
+        tools.remove(core.core_name)
 
 
 
@@ -291,7 +704,10 @@ class Command:
     Class that allows for python files in the "commands" folder to be executed.
     Other modules too can run this.
     Every file in the commands folder is supposed to have call() function that will be run.
+    The file is loaded once and loaded again only when its modification time changes.
     """
+    check_interval = 1  # seconds between checks of the file's modification time
+
     def __init__(self, file: str):
         """
         Class that allows for python files in the "commands" folder to be executed.
@@ -300,32 +716,171 @@ class Command:
         :param file: File in the commands folder to be run.
         """
         self.cmd = file.removesuffix(".py")
-        self.spec = importlib.util.spec_from_file_location(self.cmd, os.path.join("commands", file))
-        self.module = importlib.util.module_from_spec(self.spec)
+        self.path = os.path.join("commands", file)
+        self.spec = importlib.util.spec_from_file_location(self.cmd, self.path)
+        self.module = None
+        self.__mtime: int | None = None
+        self.__checked: float | None = None
+        self.reload()
+
+    def reload(self):
+        """
+        Loads the file again if it changed since it was last loaded.
+        If the new version fails to load, the previous one is kept.
+        """
+        self.__checked = time.monotonic()
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self.__mtime:
+            return
+        self.__mtime = mtime
+        module = importlib.util.module_from_spec(self.spec)
+        try:
+            self.spec.loader.exec_module(module)
+        except Exception as e:
+            from main.global_variables import logger
+            logger.log(logging.ERROR, f"Failed to load command {self.cmd}: {e!r}")
+            return
+        self.module = module
 
     async def execute(self, **kwargs):
         """
         Runs the python file in the "commands" folder.
+        call() is run in a worker thread, so blocking work doesn't stall the loop of the calling core.
+        Iterators it returns are turned into async generators that are advanced in a worker thread too.
         :param kwargs: Parameters to pass down to the call function.
         :return: It will return whatever the call returns.
         """
-        self.spec.loader.exec_module(self.module)
+        if self.__checked is None or time.monotonic() - self.__checked >= self.check_interval:
+            self.reload()
         if hasattr(self.module, "call"):
-            return self.module.call(**kwargs)
+            return_value = await asyncio.to_thread(self.module.call, **kwargs)
+            if isinstance(return_value, Iterator):
+                return iterate_in_thread(return_value)
+            return return_value
         elif hasattr(self.module, "call_async"):
             return await self.module.call_async(**kwargs)
 
+    async def stream(self, **kwargs) -> AsyncIterator:
+        """
+        Runs the python file in the "commands" folder and yields its results as they're produced.
+        :param kwargs: Parameters to pass down to the call function.
+        """
+        async for item in self.iterate(await self.execute(**kwargs)):
+            yield item
+
+    @staticmethod
+    async def iterate(return_value) -> AsyncIterator:
+        """
+        Yields items of a value returned by execute.
+        Lists and (async) iterators are yielded item by item, None is skipped and anything else is yielded as it is.
+        """
+        if isinstance(return_value, AsyncIterable):
+            async for item in return_value:
+                yield item
+        elif isinstance(return_value, (list, tuple)):
+            for item in return_value:
+                yield item
+        elif return_value is not None:
+            yield return_value
+
+
+class _BatchWorker:
+    """
+    Advances an iterator for iterate_in_thread. The iterator is only ever used by one worker thread at a time,
+    it's closed on a worker thread too, after the batch being fetched is done.
+    """
+    def __init__(self, iterator: Iterator, size: int, max_wait: float):
+        self.iterator = iterator
+        self.size = size
+        self.max_wait = max_wait
+        self.__busy = False
+        self.__stopped = False
+        self.__lock = threading.Lock()
+
+    def next_batch(self) -> list:
+        with self.__lock:
+            if self.__stopped:
+                return []
+            self.__busy = True
+        batch = []
+        try:
+            deadline = time.monotonic() + self.max_wait
+            for item in self.iterator:
+                batch.append(item)
+                if len(batch) >= self.size or time.monotonic() >= deadline or self.__stopped:
+                    break
+        finally:
+            with self.__lock:
+                self.__busy = False
+                stopped = self.__stopped
+            if stopped:
+                self.__close()
+        return batch
+
+    def stop(self):
+        """
+        Stops fetching. Closes the iterator in a worker thread, right away or once the running batch is done.
+        """
+        with self.__lock:
+            self.__stopped = True
+            busy = self.__busy
+        if not busy:
+            try:
+                asyncio.get_running_loop().run_in_executor(None, self.__close)
+            except RuntimeError:  # no loop to run it on anymore
+                self.__close()
+
+    def __close(self):
+        if hasattr(self.iterator, "close"):
+            self.iterator.close()
+
+
+async def iterate_in_thread(iterator: Iterator, batch_size: int = 64, max_wait: float = 0.05) -> AsyncIterator:
+    """
+    Advances a blocking iterator in a worker thread and yields its items.
+    Items are fetched in batches to keep the cost of switching threads low,
+    a batch is handed over early if producing it takes longer than "max_wait" seconds.
+    :param iterator: Iterator to advance.
+    :param batch_size: Maximum amount of items fetched at once.
+    :param max_wait: Seconds after which a batch is handed over even if it isn't full.
+    """
+    worker = _BatchWorker(iterator, batch_size, max_wait)
+    try:
+        while batch := await asyncio.to_thread(worker.next_batch):
+            for item in batch:
+                yield item
+    finally:
+        worker.stop()
+
 
 class Request:
-    def __init__(self, source: str, destination: str, function_name: str, arguments: dict[str, Any] | None):
+    def __init__(self, source: str, destination: str, function_name: str, arguments: dict[str, Any] | None,
+                 timeout: float | None = None):
+        """
+        Request for a function of another core. It's sent to the destination as soon as it's created.
+        :param source: Name of the core sending the request.
+        :param destination: Name of the core that should handle the request.
+        :param function_name: Requestable function of the destination core.
+        :param arguments: Arguments passed down to the function.
+        :param timeout: Seconds after which the request is cancelled. None means no deadline.
+
+        :exception IncompleteRequest: raised when source, destination or function name is None.
+        """
         if source is None or destination is None or function_name is None:
             raise IncompleteRequest
         self.request_id = uuid.uuid4()
         self.source_name = source
         self.destination_name = destination
         self.function_name = function_name
-        self.arguments = arguments
-        self.__responded = threading.Event()
+        self.arguments = arguments if arguments is not None else {}
+        self.created = time.monotonic()
+        self.deadline = self.created + timeout if timeout is not None else None
+        self.__future: concurrent.futures.Future = concurrent.futures.Future()
+        self.__future.add_done_callback(self.__on_done)
+        self.__task: asyncio.Task | None = None
         self.__response = None
         from main import global_variables
         global_variables.requests.append(self)
@@ -334,61 +889,217 @@ class Request:
         return f"<{self.request_id}>: source: {self.source_name}, destination: {self.destination_name}, function_name:{self.function_name}, arguments: {self.arguments}"
 
     def set(self):
-        self.__responded.set()
+        try:
+            self.__future.set_result(self.__response)
+        except concurrent.futures.InvalidStateError:
+            pass
 
     def is_set(self):
-        return self.__responded.is_set()
+        return self.__future.done()
 
     def response(self, response):
         self.__response = response
         self.set()
 
-    async def wait_for_response(self):
-        while not self.is_set():
-            await asyncio.sleep(1)
+    def fail(self, exception: BaseException):
+        """
+        Marks the request as failed. The exception is raised for whoever waits for the response.
+        """
+        try:
+            self.__future.set_exception(exception)
+        except concurrent.futures.InvalidStateError:
+            pass
+
+    def add_done_callback(self, callback):
+        """
+        Calls the callback with this request once it's responded, failed or cancelled.
+        The callback runs in the thread that finished the request.
+        """
+        self.__future.add_done_callback(lambda _: callback(self))
+
+    def cancel(self) -> bool:
+        """
+        Cancels the request. If the destination is already handling it, its task is cancelled too.
+        """
+        return self.__future.cancel()
+
+    def cancelled(self) -> bool:
+        return self.__future.cancelled()
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> float | None:
+        """
+        Returns seconds left until the deadline, None if the request has no deadline.
+        """
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0)
+
+    def attach(self, task: asyncio.Task):
+        """
+        Used by the destination core to link the task handling this request, so cancellation can reach it.
+        """
+        self.__task = task
+        if self.__future.cancelled():
+            task.cancel()
+
+    def __on_done(self, future: concurrent.futures.Future):
+        if future.cancelled() and self.__task is not None and not self.__task.done():
+            try:
+                self.__task.get_loop().call_soon_threadsafe(self.__task.cancel)
+            except RuntimeError:
+                pass  # destination loop is already closed
+
+    async def wait_for_response(self, timeout: float | None = None):
+        """
+        Waits on the caller's loop until the destination handles the request.
+        :param timeout: Seconds to wait. The request's own deadline is used when it's sooner.
+        :return: Response of the request.
+
+        :exception RequestTimedOut: raised when the deadline passes. The request is cancelled.
+        :exception RequestCancelled: raised when the request was cancelled.
+        Any exception raised by the requested function is raised here too.
+        """
+        remaining = self.remaining()
+        if remaining is not None and (timeout is None or remaining < timeout):
+            timeout = remaining
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self.__future), timeout)
+        except asyncio.TimeoutError:
+            self.cancel()
+            raise RequestTimedOut
+        except asyncio.CancelledError:
+            if self.__future.cancelled() and not asyncio.current_task().cancelling():
+                raise RequestCancelled
+            raise
 
     def get_response(self):
         return self.__response
 
+    def get_exception(self) -> BaseException | None:
+        if not self.__future.done() or self.__future.cancelled():
+            return None
+        return self.__future.exception()
+
 
 def get_tools():
-    requestables = []
-    for requestable in Core.get_requestable().keys():
-        if Core.get_requestable()[requestable][1]:
-            requestables.append(Core.get_requestable()[requestable][0])
-    return requestables
+    """
+    Returns schemas of the tools of every known core, see main.tools.ToolRegistry.
+    """
+    from main.global_variables import tools
+    return tools.schemas()
 
 
-class Requests(list[Request]):
+class Requests:
+    """
+    Request bus shared by every core.
+    Requests are kept in a queue per destination and the destination core is woken up on its own loop
+    as soon as something is added, so dispatching a request doesn't depend on the amount of pending requests.
+    """
     def __init__(self, logger: logging.Logger):
-        logger.log(logging.INFO, "Created new Requests list.")
-        super().__init__()
+        logger.log(logging.INFO, "Created new Requests bus.")
+        self.__lock = threading.Lock()
+        self.__queues: dict[str, collections.deque[Request]] = {}
+        self.__listeners: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+        self.default_route: Callable[[Request], None] | None = None  # receives requests for cores unknown here
 
     def __getitem__(self, core_name: str) -> list[Request]:
-        to_return = []
-        for request in self:
-            if request.destination_name == core_name:
-                to_return.append(request)
-        return to_return
+        with self.__lock:
+            return list(self.__queues.get(core_name, ()))
 
-    def __iadd__(self, other: Request | Iterable[Request]) -> None:
+    def __iadd__(self, other: Request | Iterable[Request]) -> "Requests":
         if isinstance(other, Iterable):
             self.extend(other)
         else:
             self.append(other)
+        return self
+
+    def __iter__(self):
+        with self.__lock:
+            requests = [request for queue in self.__queues.values() for request in queue]
+        return iter(requests)
+
+    def __len__(self):
+        with self.__lock:
+            return sum(len(queue) for queue in self.__queues.values())
+
+    def __contains__(self, request: Request):
+        with self.__lock:
+            return request in self.__queues.get(request.destination_name, ())
 
     def __str__(self):
-        return f"<{self.__class__}>: [{', '.join(self.__iter__().__str__())}]"
+        return f"<{self.__class__}>: [{', '.join(str(request) for request in self)}]"
 
     def append(self, request: Request):
         from main.global_variables import logger
         logger.log(logging.INFO, f"Added new request: {request}")
-        super().append(request)
+        if self.default_route is not None and not self.__is_local(request.destination_name):
+            self.default_route(request)
+            return
+        with self.__lock:
+            if request.destination_name not in self.__queues:
+                self.__queues[request.destination_name] = collections.deque()
+            self.__queues[request.destination_name].append(request)
+            listener = self.__listeners.get(request.destination_name)
+        if listener is not None:
+            self.__wake(*listener)
 
     def extend(self, requests: Iterable[Request]):
         for request in requests:
             self.append(request)
 
+    def remove(self, request: Request):
+        with self.__lock:
+            self.__queues[request.destination_name].remove(request)
+
+    def pop(self, core_name: str) -> list[Request]:
+        """
+        Takes every pending request of the core out of the bus.
+        :param core_name: Destination of the requests.
+        :return: Requests in the order they were added.
+        """
+        with self.__lock:
+            queue = self.__queues.pop(core_name, None)
+        return list(queue) if queue is not None else []
+
+    def subscribe(self, core_name: str, loop: asyncio.AbstractEventLoop, event: asyncio.Event):
+        """
+        Registers the core's loop to be woken up when a request for it arrives.
+        :param core_name: Name of the core receiving the requests.
+        :param loop: Loop on which the core handles requests.
+        :param event: Event that is set on the loop when there are new requests.
+        """
+        with self.__lock:
+            self.__listeners[core_name] = (loop, event)
+            pending = len(self.__queues.get(core_name, ())) > 0
+        if pending:
+            self.__wake(loop, event)
+
+    def unsubscribe(self, core_name: str, event: asyncio.Event):
+        with self.__lock:
+            if core_name in self.__listeners and self.__listeners[core_name][1] is event:
+                del self.__listeners[core_name]
+
+    def __is_local(self, core_name: str) -> bool:
+        from main.global_variables import threads
+        return core_name in self.__listeners or any(core.core_name == core_name for core in threads)
+
+    @staticmethod
+    def __wake(loop: asyncio.AbstractEventLoop, event: asyncio.Event):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            event.set()
+            return
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            pass  # loop is already closed, requests stay queued until the core subscribes again
+
 
 def worker_input(prompt, output):
     """
@@ -405,14 +1116,38 @@ def worker_input(prompt, output):
         output.put(None)
 
 
-async def init_extension(extension: str,  **kwargs):
-    from main.global_variables import threads, terminate_signal
-    from main.global_variables import logger
-    package = await get_extension(extension)
-    if package is None:
+async def init_extension(extension: str, process: bool | None = None, **kwargs):
+    """
+    Loads the extension and adds its core to the known modules.
+    Extensions running in a child process aren't imported by this process.
+    :param extension: Folder of the extension in "extensions".
+    :param process: If True the core runs in a child process. None uses global_variables.process_extensions.
+    :param kwargs: Parameters passed down to the core.
+    :return: Created core or None if the extension couldn't be loaded.
+    """
+    from main.global_variables import threads, terminate_signal, process_extensions
+    from main.global_variables import logger, extension_catalog, startup_profiler
+    manifest = extension_catalog.get(extension)
+    if manifest is None:
         return
+    if process is None:
+        process = extension in process_extensions
+    if process and manifest.in_process:
+        logger.log(logging.WARNING, f"{extension} sends objects that can't leave this process. "
+                                    f"Running it in this process instead of a child process.")
+        process = False
     try:
-        core = package.core.Core(terminate_signal, **kwargs)
+        if process:
+            from main.process import ProcessCore
+            core = ProcessCore.for_extension(extension, manifest.core_name, terminate_signal, **kwargs)
+        else:
+            # importing and creating the core can block, other extensions keep starting in the meantime
+            with startup_profiler.phase("import", manifest.core_name):
+                core_class = await asyncio.to_thread(extension_catalog.import_core, extension)
+            if core_class is None:
+                return
+            with startup_profiler.phase("init", manifest.core_name):
+                core = await asyncio.to_thread(core_class, terminate_signal, **kwargs)
         threads.append(core)
         logger.log(logging.INFO, f"Loaded extension: {core.core_name}!")
         return core
@@ -423,33 +1158,192 @@ async def init_extension(extension: str,  **kwargs):
 
 
 async def get_extension(extension: str):
-    from main.global_variables import logger
-    if not os.path.isdir(os.path.join("extensions", extension)) or "__" in extension:
-        return
+    """
+    Imports the extension through the extension catalog.
+    :param extension: Folder of the extension in "extensions".
+    :return: Package of the extension or None if it isn't a valid extension.
+    """
+    from main.global_variables import extension_catalog
+    if extension_catalog.import_core(extension) is None:
+        return None
+    return sys.modules[f"extensions.{extension}"]
+
+
+def import_extension(manifest: Manifest, reload: bool = False):
+    """
+    Imports the extension's package and every module in it.
+    :param manifest: Manifest of the extension.
+    :param reload: If True modules that were imported before are executed again.
+    :return: Class of the extension's core or None if it isn't a valid extension.
+    """
+    from main.global_variables import logger, startup_profiler
+    extension = manifest.folder
+
+    def timed_import(name: str):
+        start = time.perf_counter()
+        if reload and name in sys.modules:
+            module = importlib.reload(sys.modules[name])
+        else:
+            module = importlib.import_module(name)
+        startup_profiler.record_import(name, time.perf_counter() - start)
+        return module
+
     try:
         package_name = f"extensions.{extension}"
-        if package_name in sys.modules:
-            importlib.reload(sys.modules[package_name])
-        package = importlib.import_module(package_name)
+        package = timed_import(package_name)
         for _, module_name, _ in pkgutil.walk_packages(package.__path__):
-            if f"{package_name}.{module_name}" in sys.modules:
-                importlib.reload(sys.modules[f"{package_name}.{module_name}"])
-            importlib.import_module(f"{package_name}.{module_name}")
+            timed_import(f"{package_name}.{module_name}")
     except AttributeError as e:
         logger.log(logging.ERROR, "Failed to get the extension to load: %s", exc_info=e)
         return
-    if not hasattr(package, "core"):
-        logger.log(logging.ERROR, f"Couldn't load: {extension} - as it doesn't have a core file.")
+    if not hasattr(package, manifest.entry_module):
+        logger.log(logging.ERROR, f"Couldn't load: {extension} - as it doesn't have a {manifest.entry_module} file.")
         return
-    core_module = importlib.import_module(f"{package_name}.core")
-    if not hasattr(core_module, "Core"):
-        logger.log(logging.ERROR, f"Couldn't load: {extension} - as the core file doesn't have a Core implemented.")
+    core_module = importlib.import_module(f"{package_name}.{manifest.entry_module}")
+    if not hasattr(core_module, manifest.entry_class):
+        logger.log(logging.ERROR, f"Couldn't load: {extension} - as the {manifest.entry_module} file doesn't have "
+                                  f"a {manifest.entry_class} implemented.")
         return
-    if not issubclass(getattr(core_module, "Core"), Core):
+    core_class = getattr(core_module, manifest.entry_class)
+    if not isinstance(core_class, type) or not issubclass(core_class, Core):
         logger.log(logging.ERROR,
                    f"Couldn't load: {extension} - as the core file doesn't use a subclass of Core from main.utils!")
         return
-    return package
+    if core_class.core_name != manifest.core_name:
+        logger.log(logging.WARNING, f"Core of {extension} is named {core_class.core_name}, "
+                                    f"but its manifest says {manifest.core_name}.")
+    return core_class
+
+
+class ExtensionCatalog:
+    """
+    Available extensions by folder and by name of their core.
+    Extensions are described by their manifests, so listing them doesn't import any code.
+    An extension is imported once, when its core is first needed.
+    Extensions whose files changed are imported again only when asked to with reload.
+    """
+    check_interval = 1  # seconds in which the folder is walked at most once, listings in between use the last walk
+
+    def __init__(self, folder: str = "extensions"):
+        """
+        :param folder: Folder with the extensions.
+        """
+        self.folder = folder
+        self.__manifests: dict[str, Manifest | None] = {}  # None for folders that aren't valid extensions
+        self.__versions: dict[str, int] = {}
+        self.__cores: dict[str, type[Core]] = {}  # imported extensions
+        self.__refreshed: float | None = None  # time.monotonic() of the last refresh
+        self.__lock = threading.RLock()
+
+    def version(self, extension: str) -> int:
+        """
+        Returns the latest modification time of the extension's python files and manifest.
+        """
+        latest = 0
+        for current_folder, subfolders, files in os.walk(os.path.join(self.folder, extension)):
+            subfolders[:] = [subfolder for subfolder in subfolders if subfolder != "__pycache__"]
+            for file in files:
+                if file.endswith(".py") or file == MANIFEST_FILE:
+                    latest = max(latest, os.stat(os.path.join(current_folder, file)).st_mtime_ns)
+        return latest
+
+    def refresh(self, force: bool = False):
+        """
+        Adds extensions from new folders and forgets removed ones.
+        Manifests of extensions that weren't imported yet are read again once their files change.
+        :param force: If True the folder is walked even if it was walked less than "check_interval" seconds ago.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            if not force and self.__refreshed is not None and now - self.__refreshed < self.check_interval:
+                return
+            self.__refreshed = now
+            folders = set(list_dir(self.folder)) if os.path.isdir(self.folder) else set()
+            for extension in list(self.__manifests):
+                if extension not in folders:
+                    del self.__manifests[extension]
+                    del self.__versions[extension]
+            for extension in folders:
+                if extension not in self.__manifests or \
+                        (extension not in self.__cores and self.changed(extension)):
+                    self.__read(extension)
+
+    def __read(self, extension: str) -> Manifest | None:
+        self.__versions[extension] = self.version(extension)
+        try:
+            manifest = read_manifest(self.folder, extension)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            from main.global_variables import logger
+            logger.log(logging.ERROR, f"Couldn't read manifest of: {extension}!", exc_info=e)
+            manifest = None
+        self.__manifests[extension] = manifest
+        return manifest
+
+    def changed(self, extension: str) -> bool:
+        """
+        Returns if files of the extension changed since its manifest was read.
+        """
+        return extension in self.__versions and self.version(extension) != self.__versions[extension]
+
+    def import_core(self, extension: str) -> type[Core] | None:
+        """
+        Imports the extension, if it wasn't imported yet, and returns the class of its core.
+        :param extension: Folder of the extension.
+        """
+        with self.__lock:
+            if extension in self.__cores:
+                return self.__cores[extension]
+            manifest = self.get(extension)
+            if manifest is None:
+                return None
+            try:
+                core_class = import_extension(manifest)
+            except Exception as e:
+                from main.global_variables import logger
+                logger.log(logging.ERROR, f"Couldn't import: {extension}!", exc_info=e)
+                return None
+            if core_class is not None:
+                self.__cores[extension] = core_class
+            return core_class
+
+    def reload(self, extension: str) -> Manifest | None:
+        """
+        Reads the manifest and imports the extension again if its files changed.
+        :param extension: Folder of the extension.
+        """
+        with self.__lock:
+            if extension in self.__manifests and not self.changed(extension):
+                return self.__manifests[extension]
+            manifest = self.__read(extension)
+            if extension in self.__cores:
+                del self.__cores[extension]
+                if manifest is not None:
+                    try:
+                        core_class = import_extension(manifest, reload=True)
+                    except Exception as e:
+                        from main.global_variables import logger
+                        logger.log(logging.ERROR, f"Couldn't reload: {extension}!", exc_info=e)
+                        core_class = None
+                    if core_class is not None:
+                        self.__cores[extension] = core_class
+            return manifest
+
+    def entries(self) -> list[Manifest]:
+        self.refresh()
+        return [manifest for manifest in self.__manifests.values() if manifest is not None]
+
+    def get(self, extension: str) -> Manifest | None:
+        """
+        :param extension: Folder of the extension.
+        """
+        self.refresh(force=extension not in self.__manifests)  # a folder added since the last walk
+        return self.__manifests.get(extension)
+
+    def by_core_name(self, core_name: str) -> Manifest | None:
+        for manifest in self.entries():
+            if manifest.core_name == core_name:
+                return manifest
+        return None
 
 
 def add_thread_to_start(extension: str, time: int = 0):
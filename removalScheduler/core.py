@@ -1,5 +1,6 @@
 import os.path
 import threading
+import time
 
 from main import utils
 
@@ -7,6 +8,7 @@ from main import utils
 class DeletionReason:
     MANUAL = "File was deleted by user with a command."
     AUTOMATIC = "File was deleted by a garbage disposal unit."
+    RETENTION = "Log was deleted as it was too old or over the space budget."
 
 
 class Core(utils.Core):
@@ -16,6 +18,9 @@ class Core(utils.Core):
         self.__schedule: list[tuple[str, DeletionReason | str]] = []  # List of files to delete, contains pairs of: file, cause of deletion
         self.__loop_count = 0  # loop count
         self.__locked = False
+        from removalScheduler.retention import LogRetention
+        self.retention = LogRetention()
+        self.__retention_time = 0  # last time the retention has run
 
     async def call(self):
         self.set()
@@ -27,6 +32,10 @@ class Core(utils.Core):
             await self.clear_scheduler()
             self.__loop_count = -1
         self.__loop_count += 1
+        from main import global_variables
+        if time.monotonic() - self.__retention_time >= global_variables.log_retention_interval:
+            self.__retention_time = time.monotonic()
+            await self.retention.run(self)
 
     async def stay_alive(self):
         await super().stay_alive()
@@ -35,6 +44,10 @@ class Core(utils.Core):
         self.logger.info("Scheduler has shut down.")
 
     def delete_file(self, file: str, reason: DeletionReason | str, no_rename: bool = False):
+        if file.endswith(".log") or file.endswith(".log.gz"):
+            from main.logs import index_path
+            if os.path.exists(index_path(file)):
+                self.delete_file(index_path(file), reason, no_rename)
         if os.path.exists(file):
             if not no_rename:
                 os.rename(file, f"{file}.deleted")
@@ -82,7 +95,6 @@ class Core(utils.Core):
                 file = pair[0]
                 if os.path.exists(file):
                     os.remove(file)
-                    self.__schedule.remove(pair)
                 else:
-                    from main import exceptions
-                    raise exceptions.DeletionFileNotExists
\ No newline at end of file
+                    self.logger.warning(f"{file} was already deleted.")
+                self.__schedule.remove(pair)
\ No newline at end of file
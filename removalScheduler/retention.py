@@ -0,0 +1,86 @@
+import asyncio
+import gzip
+import os
+import shutil
+import time
+
+from main import exceptions, utils
+
+
+class LogRetention:
+    """
+    Keeps the logs folder within its budgets while the program runs.
+    Logs moved aside by LogHandler are compressed, then the oldest ones of every core are deleted
+    when the core uses more space than allowed or when they are too old.
+    """
+    def __init__(self, logs_folder: str = ".logs", max_bytes: int | None = None, max_age: float | None = None):
+        """
+        :param logs_folder: Folder with the main log and a folder for every core.
+        :param max_bytes: Space logs of a single core can use. Defaults to global_variables.log_max_bytes_per_core.
+        :param max_age: Seconds after which logs are deleted. Defaults to global_variables.log_max_age.
+        """
+        from main import global_variables
+        self.logs_folder = logs_folder
+        self.max_bytes = max_bytes if max_bytes is not None else global_variables.log_max_bytes_per_core
+        self.max_age = max_age if max_age is not None else global_variables.log_max_age
+
+    def folders(self) -> list[str]:
+        if not os.path.isdir(self.logs_folder):
+            return []
+        folders = [self.logs_folder]
+        for folder in utils.list_dir(self.logs_folder):
+            if os.path.isdir(os.path.join(self.logs_folder, folder)):
+                folders.append(os.path.join(self.logs_folder, folder))
+        return folders
+
+    @staticmethod
+    def archived(folder: str) -> list[str]:
+        """
+        Returns logs of the folder that aren't written to anymore.
+        """
+        return [os.path.join(folder, file) for file in utils.list_dir(folder)
+                if file != "current.log" and (file.endswith(".log") or file.endswith(".log.gz"))]
+
+    @staticmethod
+    def compress(path: str):
+        with open(path, "rb") as source, gzip.open(f"{path}.gz.tmp", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.replace(f"{path}.gz.tmp", f"{path}.gz")
+        shutil.copystat(path, f"{path}.gz")
+        os.remove(path)
+
+    def expired(self, folder: str) -> list[str]:
+        """
+        Returns logs of the folder over the age or the space budget, newest logs are kept first.
+        """
+        current = os.path.join(folder, "current.log")
+        used = os.path.getsize(current) if os.path.exists(current) else 0
+        now = time.time()
+        expired = []
+        for path in sorted(self.archived(folder), key=os.path.getmtime, reverse=True):
+            size = os.path.getsize(path)
+            if now - os.path.getmtime(path) > self.max_age or used + size > self.max_bytes:
+                expired.append(path)
+            else:
+                used += size
+        return expired
+
+    async def run(self, scheduler):
+        """
+        Compresses logs in a worker thread and schedules deletion of expired ones.
+        :param scheduler: Scheduler that deletes the files.
+        """
+        from removalScheduler.core import DeletionReason
+        for folder in self.folders():
+            for path in self.archived(folder):
+                if path.endswith(".log"):
+                    try:
+                        await asyncio.to_thread(self.compress, path)
+                    except OSError as e:
+                        scheduler.logger.warning(f"Couldn't compress {path}: {e}")
+            for path in self.expired(folder):
+                try:
+                    scheduler.delete_file(path, DeletionReason.RETENTION)
+                except exceptions.DeletionFileNotExists:
+                    pass
+        await scheduler.clear_scheduler()